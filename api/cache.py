@@ -0,0 +1,62 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from utils.metrics import metrics
+
+_MISSING = object()
+
+
+# -----------------------------
+# In-process TTL cache for hot read queries
+# -----------------------------
+class TTLCache:
+    """
+    LRU-bounded cache whose entries expire after `ttl` seconds.
+    `invalidate()` drops everything at once (new rows were inserted) and
+    bumps `generation`; a load that started before the bump passes its
+    generation to `set()` and is discarded instead of caching stale rows.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.generation = 0
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            metrics.incr("cache_misses", labels={"cache": "api"})
+            return _MISSING
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            metrics.incr("cache_misses", labels={"cache": "api"})
+            return _MISSING
+
+        self._entries.move_to_end(key)
+        metrics.incr("cache_hits", labels={"cache": "api"})
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        if generation is not None and generation != self.generation:
+            metrics.incr("cache_stale_sets", labels={"cache": "api"})
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, *_):
+        self.generation += 1
+        self._entries.clear()
+        metrics.incr("cache_invalidations", labels={"cache": "api"})
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def missing(value: Any) -> bool:
+        return value is _MISSING
@@ -0,0 +1,215 @@
+import argparse
+import base64
+import json
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+
+from aiohttp import web
+
+from api.cache import TTLCache
+from helper.database import build_dsn
+from helper.post_repo import POSTS_CHANNEL, PostsRepository
+from helper.stats_repo import StatsRepository
+from utils.config import load_config
+from utils.log_debug import log_debug
+from utils.metrics import metrics
+from utils.time_convert import normalize_datetime
+
+MAX_LIMIT = 200
+
+FILTERS = ("platform", "category", "author")
+
+
+# -----------------------------
+# Request parsing helpers
+# -----------------------------
+def bad_request(message: str) -> web.HTTPBadRequest:
+    return web.HTTPBadRequest(
+        text=json.dumps({"error": message}),
+        content_type="application/json",
+    )
+
+
+def encode_cursor(score: int, post_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{score}:{post_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, post_id = base64.urlsafe_b64decode(padded).decode().split(":")
+        return int(score), int(post_id)
+    except ValueError:
+        raise bad_request("invalid cursor")
+
+
+def parse_int(request: web.Request, name: str, default: Optional[int] = None) -> Optional[int]:
+    value = request.query.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise bad_request(f"{name} must be an integer")
+
+
+def parse_time(request: web.Request, name: str) -> Optional[datetime]:
+    value = request.query.get(name)
+    if not value:
+        return None
+    try:
+        return normalize_datetime(datetime.fromisoformat(value))
+    except ValueError:
+        raise bad_request(f"{name} must be an ISO 8601 datetime")
+
+
+def serialize(row: Dict) -> Dict:
+    out = dict(row)
+    for key, value in out.items():
+        if isinstance(value, (datetime, date)):
+            out[key] = value.isoformat()
+    if isinstance(out.get("engagement"), str):
+        out["engagement"] = json.loads(out["engagement"])
+    return out
+
+
+# -----------------------------
+# Read API over PostsRepository
+# -----------------------------
+class PostsAPI:
+    def __init__(self, repo: PostsRepository, stats: StatsRepository, cache: TTLCache):
+        self.repo = repo
+        self.stats = stats
+        self.cache = cache
+        self._listener = None
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/health", self.health)
+        app.router.add_get("/metrics", self.prometheus)
+        app.router.add_get("/posts", self.list_posts)
+        app.router.add_get("/posts/top", self.top_posts)
+        app.router.add_get("/authors/top", self.top_authors)
+        app.router.add_get("/categories/trends", self.category_trends)
+        app.on_startup.append(self._listen)
+        app.on_cleanup.append(self._unlisten)
+        return app
+
+    async def _listen(self, app: web.Application):
+        """
+        The pipeline runs in another process; it NOTIFYs after each insert
+        batch and the cache is dropped. The TTL bounds staleness if the
+        listener connection is unavailable.
+        """
+        try:
+            import asyncpg
+
+            dsn = build_dsn().replace("postgresql+asyncpg://", "postgresql://", 1)
+            self._listener = await asyncpg.connect(dsn)
+            await self._listener.add_listener(POSTS_CHANNEL, self.cache.invalidate)
+            log_debug(f"Listening for {POSTS_CHANNEL} notifications")
+        except Exception as e:
+            log_debug(f"Cache invalidation listener unavailable, relying on TTL: {e}")
+            self._listener = None
+
+    async def _unlisten(self, app: web.Application):
+        if self._listener is not None:
+            await self._listener.close()
+            self._listener = None
+
+    async def _query(self, request: web.Request, limit: int, after: Optional[Tuple[int, int]]):
+        filters = {name: request.query.get(name) or None for name in FILTERS}
+        since = parse_time(request, "since")
+        until = parse_time(request, "until")
+        min_score = parse_int(request, "min_score")
+
+        return await self._cached(
+            ("posts", tuple(filters.items()), since, until, min_score, limit, after),
+            lambda: self.repo.query_posts(
+                **filters,
+                since=since,
+                until=until,
+                min_score=min_score,
+                limit=limit,
+                after=after,
+            ),
+        )
+
+    async def list_posts(self, request: web.Request) -> web.Response:
+        limit = min(max(parse_int(request, "limit", 50), 1), MAX_LIMIT)
+        cursor = request.query.get("cursor")
+        after = decode_cursor(cursor) if cursor else None
+
+        rows = await self._query(request, limit, after)
+        next_cursor = None
+        if len(rows) == limit:
+            last = rows[-1]
+            next_cursor = encode_cursor(last["score"], last["id"])
+
+        return web.json_response({"posts": rows, "next_cursor": next_cursor})
+
+    async def top_posts(self, request: web.Request) -> web.Response:
+        n = min(max(parse_int(request, "n", 10), 1), MAX_LIMIT)
+        rows = await self._query(request, n, None)
+        return web.json_response({"posts": rows})
+
+    async def _cached(self, key, load):
+        value = self.cache.get(key)
+        if TTLCache.missing(value):
+            # a NOTIFY arriving during load() makes these rows stale
+            generation = self.cache.generation
+            value = [serialize(row) for row in await load()]
+            self.cache.set(key, value, generation=generation)
+        return value
+
+    async def top_authors(self, request: web.Request) -> web.Response:
+        platform = request.query.get("platform") or None
+        min_high_intent = parse_int(request, "min_high_intent", 2)
+        limit = min(max(parse_int(request, "limit", 50), 1), MAX_LIMIT)
+
+        rows = await self._cached(
+            ("authors", platform, min_high_intent, limit),
+            lambda: self.stats.top_authors(platform=platform, min_high_intent=min_high_intent, limit=limit),
+        )
+        return web.json_response({"authors": rows})
+
+    async def category_trends(self, request: web.Request) -> web.Response:
+        platform = request.query.get("platform") or None
+        category = request.query.get("category") or None
+        days = min(max(parse_int(request, "days", 30), 1), 366)
+
+        rows = await self._cached(
+            ("categories", platform, category, days),
+            lambda: self.stats.category_trends(platform=platform, category=category, days=days),
+        )
+        return web.json_response({"categories": rows})
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "status": "ok",
+            "cache_entries": len(self.cache),
+            "invalidation_listener": self._listener is not None,
+        })
+
+    async def prometheus(self, request: web.Request) -> web.Response:
+        return web.Response(text=metrics.to_prometheus(), content_type="text/plain")
+
+
+def main(argv=None):
+    api_config = load_config().app.get("api") or {}
+
+    parser = argparse.ArgumentParser(description="Read API over scored posts.")
+    parser.add_argument("--host", default=api_config.get("host", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=api_config.get("port", 8080))
+    args = parser.parse_args(argv)
+
+    cache = TTLCache(
+        ttl=api_config.get("cache_ttl_seconds", 30),
+        max_entries=api_config.get("cache_max_entries", 1024),
+    )
+    api = PostsAPI(PostsRepository(), StatsRepository(), cache)
+    web.run_app(api.app(), host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import argparse
+import asyncio
+import random
+import re
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from aiohttp import web
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+LISTING_PATH = "/et/whats-new/posts/"
+
+THREAD_ID_RE = re.compile(r"(/threads/[^\"/]*?\.)(\d+)(/)")
+DATETIME_RE = re.compile(r'datetime="[^"]+"')
+LAST_PAGE_RE = re.compile(r"(page-)25(\">)25(<)")
+
+
+# -----------------------------
+# Local forum server replaying recorded pages
+# -----------------------------
+class MockForumServer:
+    """
+    Serves bench/fixtures as an EliteTrader-like forum on localhost.
+
+    Listing pages get unique thread ids per page and fresh timestamps so
+    the scraper's cutoff never stops a crawl early. Latency, jitter and
+    error rate are configurable to mimic a slow or flaky upstream.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        pages: int = 25,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: int = 42,
+    ):
+        self.host = host
+        self.port = port
+        self.pages = pages
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+
+        self.listing_html = (FIXTURES_DIR / "listing.html").read_text(encoding="utf-8")
+        self.thread_html = (FIXTURES_DIR / "thread.html").read_text(encoding="utf-8")
+
+        self.requests = 0
+        self.errors = 0
+        self._runner = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def listing_url(self) -> str:
+        return f"{self.base_url}{LISTING_PATH}"
+
+    def _app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get(LISTING_PATH, self._listing)
+        app.router.add_get(LISTING_PATH + "page-{page:\\d+}", self._listing)
+        app.router.add_get("/et/threads/{slug}/", self._thread)
+        return app
+
+    async def start(self):
+        self._runner = web.AppRunner(self._app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if not self.port:
+            self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def _simulate(self):
+        self.requests += 1
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors += 1
+            return web.Response(status=self.error_status, text="simulated error")
+        return None
+
+    def render_listing(self, page: int) -> str:
+        offset = page * 1000
+        html = THREAD_ID_RE.sub(lambda m: f"{m.group(1)}{int(m.group(2)) + offset}{m.group(3)}", self.listing_html)
+
+        now = datetime.now(timezone.utc)
+        counter = iter(range(10_000))
+
+        def fresh(_):
+            ts = now - timedelta(minutes=page * 40 + next(counter))
+            return f'datetime="{ts.strftime("%Y-%m-%dT%H:%M:%S+0000")}"'
+
+        html = DATETIME_RE.sub(fresh, html)
+        return LAST_PAGE_RE.sub(lambda m: f"{m.group(1)}{self.pages}{m.group(2)}{self.pages}{m.group(3)}", html)
+
+    async def _listing(self, request: web.Request) -> web.Response:
+        error = await self._simulate()
+        if error:
+            return error
+        page = int(request.match_info.get("page", 1))
+        if page > self.pages:
+            return web.Response(status=404, text="not found")
+        return web.Response(text=self.render_listing(page), content_type="text/html")
+
+    async def _thread(self, request: web.Request) -> web.Response:
+        error = await self._simulate()
+        if error:
+            return error
+        return web.Response(text=self.thread_html, content_type="text/html")
+
+
+async def serve_forever(server: MockForumServer):
+    async with server:
+        print(f"Mock forum listening on {server.listing_url}")
+        await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded forum pages locally.")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--pages", type=int, default=25)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    args = parser.parse_args()
+
+    asyncio.run(serve_forever(MockForumServer(
+        port=args.port,
+        pages=args.pages,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+    )))
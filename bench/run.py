@@ -0,0 +1,356 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from models.post import Post
+from utils.config import load_config
+from utils.log_debug import log_debug
+from utils.metrics import metrics
+from utils.profiling import profiler
+
+BENCH_DIR = Path(__file__).parent
+FIXTURES_DIR = BENCH_DIR / "fixtures"
+RESULTS_DIR = BENCH_DIR / "results"
+
+FILLER_WORDS = (
+    "the market opened higher today and futures traded in a tight range while "
+    "volume stayed light into the close i think the setup looks fine but entries "
+    "need work broker platform data feed chart indicator trend support resistance"
+).split()
+
+LOCAL_DB_HOSTS = {"", "localhost", "127.0.0.1", "::1"}
+
+# Higher is better for these; everything else numeric is treated as a cost.
+THROUGHPUT_KEYS = ("posts_per_second", "pages_per_second", "rows_per_second")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCH_DIR.parent,
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+# -----------------------------
+# Synthetic corpus
+# -----------------------------
+def synthetic_posts(count: int, keywords_config: dict, seed: int = 7) -> List[Post]:
+    rng = random.Random(seed)
+
+    phrases = [p for group in keywords_config.get("positive", {}).values() for p in group]
+    phrases += list(keywords_config.get("negative", {}))
+
+    posts = []
+    for i in range(count):
+        words = rng.choices(FILLER_WORDS, k=rng.randint(20, 220))
+        for _ in range(rng.randint(0, 4)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(phrases))
+        title_words = rng.choices(FILLER_WORDS, k=6)
+        if rng.random() < 0.3:
+            title_words.append(rng.choice(phrases))
+
+        posts.append(Post(
+            platform="bench",
+            external_id=str(i),
+            url=f"https://example.invalid/threads/{i}/",
+            title=" ".join(title_words),
+            content=" ".join(words),
+            author=f"user{i % 997}",
+            category="Synthetic",
+            replies=rng.randint(0, 40),
+            views=rng.randint(0, 5000),
+            published_at=datetime.now(timezone.utc),
+        ))
+    return posts
+
+
+# -----------------------------
+# Benchmarks
+# -----------------------------
+async def bench_crawl(max_posts: int, pages: int, latency: float, error_rate: float) -> Dict:
+    from bench.mock_server import MockForumServer
+    from scrape.elitetrader import EliteTraderScraper
+
+    async with MockForumServer(pages=pages, latency=latency, error_rate=error_rate) as server:
+        scraper = EliteTraderScraper(
+            headers={"User-Agent": "posts-monitoring-bench"},
+            base_url=server.base_url,
+            categories=[{"name": "New Posts", "url": server.listing_url}],
+            max_posts_per_run=max_posts,
+            from_days_ago=365,
+            delay=0,
+        )
+
+        metrics.reset()
+        start = time.perf_counter()
+        posts = await scraper.scrape_posts()
+        elapsed = time.perf_counter() - start
+        summary = metrics.summary()
+
+    return {
+        "posts": len(posts),
+        "elapsed_seconds": round(elapsed, 4),
+        "posts_per_second": round(len(posts) / elapsed, 2) if elapsed else 0.0,
+        "pages_per_second": summary["pages_per_second"],
+        "fetch_p95_seconds": summary["fetch_p95_seconds"],
+        "bytes_downloaded": summary["bytes_downloaded"],
+        "server_requests": server.requests,
+        "server_errors": server.errors,
+    }
+
+
+async def bench_parse(iterations: int) -> Dict:
+    from bs4 import BeautifulSoup
+    from scrape.elitetrader import EliteTraderScraper
+    from scrape.fetch import FetchClient
+
+    listing_html = (FIXTURES_DIR / "listing.html").read_text(encoding="utf-8")
+    thread_bytes = (FIXTURES_DIR / "thread.html").read_bytes()
+
+    class FixtureContent:
+        async def iter_chunked(self, size: int):
+            for i in range(0, len(thread_bytes), size):
+                yield thread_bytes[i:i + size]
+
+    class FixtureResponse:
+        content = FixtureContent()
+
+    reader = FetchClient(session=None)
+    parsed_bytes = []
+
+    class FixtureScraper(EliteTraderScraper):
+        # same streamed, truncated read as production (stop_marker / max_bytes)
+        async def _fetch(self, client, url: str, stop_marker=None, stop_count=1, max_bytes=None) -> str:
+            body = await reader._read(FixtureResponse(), stop_marker, stop_count, max_bytes)
+            parsed_bytes.append(len(body))
+            return body.decode("utf-8", errors="replace")
+
+    scraper = FixtureScraper(headers={}, base_url="http://fixture", categories=[], max_posts_per_run=0)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        soup = BeautifulSoup(listing_html, "html.parser")
+        soup.select("div.structItem.structItem--thread")
+    listing_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await scraper._scrape_thread(None, "http://fixture/thread")
+    thread_elapsed = time.perf_counter() - start
+
+    return {
+        "iterations": iterations,
+        "listing_ms_per_page": round(listing_elapsed / iterations * 1000, 3),
+        "thread_ms_per_page": round(thread_elapsed / iterations * 1000, 3),
+        "thread_bytes_parsed": parsed_bytes[-1] if parsed_bytes else 0,
+        "thread_bytes_total": len(thread_bytes),
+    }
+
+
+def bench_score(sizes: List[int], scoring_config: dict, keywords_config: dict) -> Dict:
+    from score.engine import build_scorer
+
+    scorer = build_scorer(scoring_config=scoring_config, keywords_config=keywords_config)
+    results = {}
+    for size in sizes:
+        posts = synthetic_posts(size, keywords_config)
+        start = time.perf_counter()
+        scorer.score_posts(posts)
+        elapsed = time.perf_counter() - start
+        results[str(size)] = {
+            "elapsed_seconds": round(elapsed, 4),
+            "posts_per_second": round(size / elapsed, 2) if elapsed else 0.0,
+        }
+        del posts
+    return results
+
+
+def select_bench_db(dsn: Optional[str]):
+    """
+    bench_db creates tables and deletes rows, so it only runs against an
+    explicit --dsn / BENCH_DSN or a PGSQL_HOST on this machine.
+    """
+    from helper.database import build_dsn, use_dsn
+
+    dsn = dsn or os.getenv("BENCH_DSN")
+    if dsn:
+        use_dsn(dsn)
+        return
+
+    host = urlsplit(build_dsn()).hostname or ""
+    if host not in LOCAL_DB_HOSTS:
+        raise SystemExit(
+            f"Refusing to run the db benchmark against {host}; "
+            "use a local PGSQL_HOST or pass --dsn / BENCH_DSN"
+        )
+
+
+async def bench_db(rows: int, batch_size: int, keywords_config: dict) -> Dict:
+    from sqlalchemy import text
+    from helper.database import AsyncSessionLocal, create_tables
+    from helper.post_repo import PostsRepository
+
+    await create_tables()
+    repo = PostsRepository()
+    posts = synthetic_posts(rows, keywords_config)
+    run_tag = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+    for post in posts:
+        post.external_id = f"{run_tag}-{post.external_id}"
+
+    start = time.perf_counter()
+    for i in range(0, rows, batch_size):
+        await repo.insert_posts(posts[i:i + batch_size])
+    elapsed = time.perf_counter() - start
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(text("DELETE FROM posts WHERE platform = 'bench'"))
+        await session.execute(text("DELETE FROM author_stats WHERE platform = 'bench'"))
+        await session.execute(text("DELETE FROM category_daily_stats WHERE platform = 'bench'"))
+        await session.commit()
+
+    return {
+        "rows": rows,
+        "batch_size": batch_size,
+        "elapsed_seconds": round(elapsed, 4),
+        "rows_per_second": round(rows / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+# -----------------------------
+# Result storage / comparison
+# -----------------------------
+def save_results(results: Dict) -> Path:
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = RESULTS_DIR / f"{stamp}_{results['commit']}.json"
+    path.write_text(json.dumps(results, indent=2, sort_keys=True), encoding="utf-8")
+    return path
+
+
+def previous_results(exclude: Path) -> Optional[Dict]:
+    files = sorted(p for p in RESULTS_DIR.glob("*.json") if p != exclude)
+    if not files:
+        return None
+    return json.loads(files[-1].read_text(encoding="utf-8"))
+
+
+def compare(current: Dict, previous: Dict, prefix: str = "", threshold: float = 0.10) -> List[str]:
+    lines = []
+    for key, value in current.items():
+        old = previous.get(key) if isinstance(previous, dict) else None
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            lines.extend(compare(value, old or {}, f"{name}.", threshold))
+            continue
+        if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or not old:
+            continue
+
+        change = (value - old) / old
+        higher_is_better = key in THROUGHPUT_KEYS
+        regressed = change < -threshold if higher_is_better else change > threshold
+        if key.endswith(("_seconds", "_ms_per_page")) or higher_is_better:
+            marker = "  REGRESSION" if regressed else ""
+            lines.append(f"{name}: {old} -> {value} ({change:+.1%}){marker}")
+    return lines
+
+
+# -----------------------------
+# Entry point
+# -----------------------------
+async def main(args):
+    config = load_config()
+    keywords_config = config.keywords
+    scoring_config = config.scoring
+    if args.engine:
+        scoring_config = {**scoring_config, "engine": args.engine}
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "machine": platform.machine(),
+        "benchmarks": {},
+    }
+    selected = set(args.only or ["crawl", "parse", "score"] + (["db"] if args.db else []))
+    if "db" in selected:
+        select_bench_db(args.dsn)
+
+    if args.profile:
+        profiler.enable(mode=args.profile_mode, run_name="bench")
+
+    try:
+        if "parse" in selected:
+            log_debug("Benchmark: parse")
+            with profiler.stage("bench_parse"):
+                results["benchmarks"]["parse"] = await bench_parse(args.parse_iterations)
+
+        if "score" in selected:
+            log_debug(f"Benchmark: score {args.score_sizes}")
+            with profiler.stage("bench_score"):
+                results["benchmarks"]["score"] = bench_score(args.score_sizes, scoring_config, keywords_config)
+
+        if "crawl" in selected:
+            log_debug("Benchmark: crawl")
+            with profiler.stage("bench_crawl"):
+                results["benchmarks"]["crawl"] = await bench_crawl(
+                    args.crawl_posts, args.crawl_pages, args.latency, args.error_rate
+                )
+
+        if "db" in selected:
+            log_debug("Benchmark: db")
+            with profiler.stage("bench_db"):
+                results["benchmarks"]["db"] = await bench_db(args.db_rows, args.db_batch, keywords_config)
+    finally:
+        profiler.stop()
+
+    if args.profile:
+        # profiler overhead skews the numbers; keep them out of the history
+        print(json.dumps(results["benchmarks"], indent=2))
+        return
+
+    path = save_results(results)
+    log_debug(f"Saved results to {path}")
+    print(json.dumps(results["benchmarks"], indent=2))
+
+    previous = previous_results(exclude=path)
+    if previous:
+        log_debug(f"Compared with {previous.get('commit')} ({previous.get('timestamp')}):")
+        for line in compare(results["benchmarks"], previous.get("benchmarks", {})):
+            print(f"  {line}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks against recorded fixtures.")
+    parser.add_argument("--only", nargs="+", choices=["crawl", "parse", "score", "db"])
+    parser.add_argument("--db", action="store_true", help="include the Postgres bulk insert benchmark")
+    parser.add_argument("--crawl-posts", type=int, default=200)
+    parser.add_argument("--crawl-pages", type=int, default=25)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--parse-iterations", type=int, default=50)
+    parser.add_argument("--engine", choices=["keywords", "linear"], help="override scoring.yaml engine")
+    parser.add_argument("--score-sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--db-rows", type=int, default=10_000)
+    parser.add_argument("--db-batch", type=int, default=1_000)
+    parser.add_argument("--dsn", help="Postgres DSN for the db benchmark (default: BENCH_DSN, else a local PGSQL_HOST)")
+    parser.add_argument("--profile", action="store_true", help="profile each benchmark into debug/profile/; results are not saved")
+    parser.add_argument("--profile-mode", choices=("sample", "cprofile"), default="sample")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,173 @@
+from sqlalchemy import text
+from typing import Dict, Optional
+from helper.database import AsyncSessionLocal
+
+class BackfillRepository:
+    """
+    Page-level work queue for historical crawls, kept in backfill_pages so
+    an interrupted backfill resumes from the pages not yet done.
+    """
+
+    def __init__(self, platform: str, max_attempts: int = 3, stale_after: float = 1800.0):
+        self.platform = platform
+        self.max_attempts = max_attempts
+        # seconds before an in_progress claim is presumed abandoned
+        self.stale_after = stale_after
+
+    async def enqueue_pages(self, category_url: str, from_page: int, to_page: int):
+        query = text("""
+            INSERT INTO backfill_pages (platform, category_url, page)
+            SELECT :platform, :category_url, p
+            FROM generate_series(CAST(:from_page AS INT), CAST(:to_page AS INT)) AS p
+            ON CONFLICT (category_url, page)
+            DO NOTHING
+        """)
+
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                query,
+                {
+                    "platform": self.platform,
+                    "category_url": category_url,
+                    "from_page": from_page,
+                    "to_page": to_page,
+                }
+            )
+            await session.commit()
+
+    async def requeue_in_progress(self, category_url: str) -> int:
+        """
+        Pages left in_progress by a crashed run go back to pending. Only
+        claims older than stale_after are touched, so pages a concurrently
+        running backfill is still working on are left alone.
+        """
+        query = text("""
+            UPDATE backfill_pages
+            SET status = 'pending', worker = NULL, updated_at = NOW()
+            WHERE category_url = :category_url
+              AND status = 'in_progress'
+              AND (
+                claimed_at IS NULL
+                OR claimed_at < NOW() - make_interval(secs => CAST(:stale_after AS DOUBLE PRECISION))
+              )
+        """)
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                query,
+                {"category_url": category_url, "stale_after": self.stale_after},
+            )
+            await session.commit()
+            return result.rowcount
+
+    async def requeue_failed(self, category_url: str) -> int:
+        """
+        Pages that used up max_attempts go back to pending with a fresh
+        attempt count.
+        """
+        query = text("""
+            UPDATE backfill_pages
+            SET status = 'pending', attempts = 0, worker = NULL, updated_at = NOW()
+            WHERE category_url = :category_url
+              AND status = 'failed'
+              AND attempts >= :max_attempts
+        """)
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                query,
+                {"category_url": category_url, "max_attempts": self.max_attempts},
+            )
+            await session.commit()
+            return result.rowcount
+
+    async def claim_page(self, category_url: str, worker: str) -> Optional[Dict]:
+        query = text("""
+            UPDATE backfill_pages
+            SET status = 'in_progress',
+                attempts = attempts + 1,
+                worker = :worker,
+                claimed_at = NOW(),
+                updated_at = NOW()
+            WHERE id = (
+                SELECT id
+                FROM backfill_pages
+                WHERE category_url = :category_url
+                  AND (
+                    status = 'pending'
+                    OR (status = 'failed' AND attempts < :max_attempts)
+                  )
+                ORDER BY page
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, page
+        """)
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                query,
+                {
+                    "category_url": category_url,
+                    "worker": worker,
+                    "max_attempts": self.max_attempts,
+                }
+            )
+            row = result.fetchone()
+            await session.commit()
+
+        if row is None:
+            return None
+        return {"id": row[0], "page": row[1]}
+
+    async def complete_page(self, page_id: int, posts_found: int):
+        query = text("""
+            UPDATE backfill_pages
+            SET status = 'done', posts_found = :posts_found, last_error = NULL, updated_at = NOW()
+            WHERE id = :id
+        """)
+
+        async with AsyncSessionLocal() as session:
+            await session.execute(query, {"id": page_id, "posts_found": posts_found})
+            await session.commit()
+
+    async def release_page(self, page_id: int):
+        """
+        Hand a claimed page back without counting the attempt, e.g. when
+        the host's circuit breaker rejected the request outright.
+        """
+        query = text("""
+            UPDATE backfill_pages
+            SET status = 'pending',
+                attempts = GREATEST(attempts - 1, 0),
+                worker = NULL,
+                updated_at = NOW()
+            WHERE id = :id
+        """)
+
+        async with AsyncSessionLocal() as session:
+            await session.execute(query, {"id": page_id})
+            await session.commit()
+
+    async def fail_page(self, page_id: int, error: str):
+        query = text("""
+            UPDATE backfill_pages
+            SET status = 'failed', last_error = :error, updated_at = NOW()
+            WHERE id = :id
+        """)
+
+        async with AsyncSessionLocal() as session:
+            await session.execute(query, {"id": page_id, "error": error})
+            await session.commit()
+
+    async def progress(self, category_url: str) -> Dict[str, int]:
+        query = text("""
+            SELECT status, COUNT(*)
+            FROM backfill_pages
+            WHERE category_url = :category_url
+            GROUP BY status
+        """)
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(query, {"category_url": category_url})
+            return {row[0]: row[1] for row in result.fetchall()}
@@ -1,65 +1,78 @@
-import os
-import dotenv
 from urllib.parse import quote_plus
 from sqlalchemy import text
-from typing import AsyncGenerator
 
+from utils.config import env
 from utils.log_debug import log_debug
 
-from sqlalchemy.ext.asyncio import (
-    create_async_engine,
-    AsyncSession,
-    async_sessionmaker,
-)
-
-env = os.getenv("APP_ENV", "local")
-dotenv.load_dotenv(f".env.{env}")
-
-DB_HOST = os.getenv("PGSQL_HOST", "localhost")
-DB_USER = os.getenv("PGSQL_USER", "postgres")
-DB_PORT = os.getenv("PGSQL_PORT", "5432")
-DB_DATABASE = os.getenv("PGSQL_DATABASE", "posts_monitoring")
-DB_PASSWORD = os.getenv("PGSQL_PASSWORD", "")
-
 # ---------------------------------------------------------
 # Build DSN
 # ---------------------------------------------------------
 def build_dsn() -> str:
-    DB_PASSWORD_ESCAPED = quote_plus(DB_PASSWORD)
+    DB_HOST = env("PGSQL_HOST", "localhost")
+    DB_USER = env("PGSQL_USER", "postgres")
+    DB_PORT = env("PGSQL_PORT", "5432")
+    DB_DATABASE = env("PGSQL_DATABASE", "posts_monitoring")
+    DB_PASSWORD_ESCAPED = quote_plus(env("PGSQL_PASSWORD", ""))
 
     return (
         f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD_ESCAPED}"
         f"@{DB_HOST}:{DB_PORT}/{DB_DATABASE}"
     )
 
-DATABASE_URL = build_dsn()
-
 # ---------------------------------------------------------
-# Async SQLAlchemy Engine
+# Async SQLAlchemy Engine (created on first use)
 # ---------------------------------------------------------
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=False,
-    pool_size=5,
-    max_overflow=10,
-    future=True,
-)
+_engine = None
+_session_factory = None
+_dsn_override = None
+
+def use_dsn(dsn: str):
+    """
+    Point the engine at `dsn` instead of the PGSQL_* settings (the bench
+    uses this). Must be called before the first query.
+    """
+    global _dsn_override
+    if _engine is not None:
+        raise RuntimeError("use_dsn() called after the engine was created")
+    if dsn.startswith("postgresql://"):
+        dsn = dsn.replace("postgresql://", "postgresql+asyncpg://", 1)
+    _dsn_override = dsn
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        _engine = create_async_engine(
+            _dsn_override or build_dsn(),
+            echo=False,
+            pool_size=5,
+            max_overflow=10,
+            future=True,
+        )
+    return _engine
 
 # ---------------------------------------------------------
 # AsyncSession
 # ---------------------------------------------------------
-AsyncSessionLocal = async_sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
+def AsyncSessionLocal():
+    global _session_factory
+    if _session_factory is None:
+        from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+        _session_factory = async_sessionmaker(
+            bind=get_engine(),
+            class_=AsyncSession,
+            expire_on_commit=False,
+        )
+    return _session_factory()
 
 # ---------------------------------------------------------
 # Test the database connection
 # ---------------------------------------------------------
 async def check_db_connection() -> bool:
     try:
-        async with engine.connect() as conn:
+        async with get_engine().connect() as conn:
             await conn.execute(text("SELECT 1"))
         return True
     except Exception as e:
@@ -104,7 +117,88 @@ async def create_tables():
     );
     """
     
-    async with engine.begin() as conn:
+    backfill_pages_table_sql = """
+    CREATE TABLE IF NOT EXISTS public.backfill_pages (
+        id BIGSERIAL PRIMARY KEY,
+        platform VARCHAR(50) NOT NULL,
+        category_url VARCHAR(255) NOT NULL,
+        page INT NOT NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'pending',
+        attempts INT DEFAULT 0,
+        posts_found INT,
+        worker VARCHAR(100),
+        last_error TEXT,
+        claimed_at TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT NOW(),
+
+        CONSTRAINT backfill_pages_unique
+            UNIQUE (category_url, page)
+    );
+    """
+
+    backfill_pages_index_sql = """
+    CREATE INDEX IF NOT EXISTS backfill_pages_status_idx
+        ON public.backfill_pages (category_url, status, page);
+    """
+
+    posts_label_column_sql = """
+    ALTER TABLE public.posts
+        ADD COLUMN IF NOT EXISTS intent_label SMALLINT;
+    """
+
+    posts_category_column_sql = """
+    ALTER TABLE public.posts
+        ADD COLUMN IF NOT EXISTS category VARCHAR(255);
+    """
+
+    posts_bonus_column_sql = """
+    ALTER TABLE public.posts
+        ADD COLUMN IF NOT EXISTS reputation_bonus SMALLINT NOT NULL DEFAULT 0;
+    """
+
+    posts_score_index_sql = """
+    CREATE INDEX IF NOT EXISTS posts_score_id_idx
+        ON public.posts (score DESC, id DESC);
+    """
+
+    author_stats_table_sql = """
+    CREATE TABLE IF NOT EXISTS public.author_stats (
+        platform VARCHAR(50) NOT NULL,
+        author VARCHAR(50) NOT NULL,
+        post_count INT NOT NULL DEFAULT 0,
+        high_intent_count INT NOT NULL DEFAULT 0,
+        score_sum BIGINT NOT NULL DEFAULT 0,
+        first_seen_at TIMESTAMP,
+        last_seen_at TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT NOW(),
+
+        PRIMARY KEY (platform, author)
+    );
+    """
+
+    category_daily_stats_table_sql = """
+    CREATE TABLE IF NOT EXISTS public.category_daily_stats (
+        platform VARCHAR(50) NOT NULL,
+        category VARCHAR(255) NOT NULL,
+        day DATE NOT NULL,
+        post_count INT NOT NULL DEFAULT 0,
+        high_intent_count INT NOT NULL DEFAULT 0,
+        score_sum BIGINT NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT NOW(),
+
+        PRIMARY KEY (platform, category, day)
+    );
+    """
+
+    async with get_engine().begin() as conn:
         await conn.execute(text(posts_table_sql))
+        await conn.execute(text(posts_label_column_sql))
+        await conn.execute(text(posts_category_column_sql))
+        await conn.execute(text(posts_bonus_column_sql))
+        await conn.execute(text(posts_score_index_sql))
         await conn.execute(text(logs_table_sql))
+        await conn.execute(text(backfill_pages_table_sql))
+        await conn.execute(text(backfill_pages_index_sql))
+        await conn.execute(text(author_stats_table_sql))
+        await conn.execute(text(category_daily_stats_table_sql))
         await conn.commit()       
\ No newline at end of file
@@ -0,0 +1,53 @@
+import json
+import uuid
+from sqlalchemy import text
+from typing import Dict, Optional
+from helper.database import AsyncSessionLocal
+
+class LogsRepository:
+    def __init__(self, created_by: str = "main"):
+        self.created_by = created_by
+
+    async def insert_log(
+        self,
+        event_type: str,
+        event_status: str,
+        reason: Optional[str] = None,
+        metadata: Optional[Dict] = None,
+    ) -> str:
+        log_uuid = str(uuid.uuid4())
+
+        query = text("""
+            INSERT INTO logs (
+                uuid,
+                event_type,
+                event_status,
+                reason,
+                metadata,
+                created_by
+            )
+            VALUES (
+                :uuid,
+                :event_type,
+                :event_status,
+                :reason,
+                :metadata,
+                :created_by
+            )
+        """)
+
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                query,
+                {
+                    "uuid": log_uuid,
+                    "event_type": event_type,
+                    "event_status": event_status,
+                    "reason": reason,
+                    "metadata": json.dumps(metadata or {}),
+                    "created_by": self.created_by,
+                }
+            )
+            await session.commit()
+
+        return log_uuid
@@ -1,10 +1,22 @@
+from datetime import datetime
 from sqlalchemy import text
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from helper.database import AsyncSessionLocal
+from models.post import Post
+from utils.metrics import metrics
+
+POSTS_CHANNEL = "posts_inserted"
+
+QUERY_COLUMNS = """
+    id, platform, external_id, url, title, author, category,
+    published_at, score, engagement
+"""
 
 class PostsRepository:
-    def __init__(self):
-        pass
+    def __init__(self, high_intent_score: int = 10):
+        # posts at or above this score (without the author reputation
+        # bonus) count as high intent in the aggregates
+        self.high_intent_score = high_intent_score
 
     async def get_existing_external_ids(
         self,
@@ -21,48 +33,222 @@ class PostsRepository:
               AND external_id = ANY(:external_ids)
         """)
 
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(
-                query,
-                {
-                    "platform": platform,
-                    "external_ids": external_ids,
-                }
-            )
+        with metrics.timer("db_seconds", labels={"op": "get_existing_external_ids"}):
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    query,
+                    {
+                        "platform": platform,
+                        "external_ids": external_ids,
+                    }
+                )
+
+                return {row[0] for row in result.fetchall()}
 
-            return {row[0] for row in result.fetchall()}
+    async def insert_posts(self, posts: List[Post]) -> int:
+        """
+        Inserts new posts in one statement and folds the rows actually
+        inserted (not conflicting duplicates) into author_stats and
+        category_daily_stats in the same transaction. Aggregates use the
+        score minus reputation_bonus, so an author's reputation never
+        feeds back into their own high_intent_count. Returns the number
+        of inserted rows.
 
-    async def insert_posts(self, posts: List[Dict]):
+        Every insert runs in key order so concurrent batches (backfill
+        workers) take row locks in the same order and cannot deadlock.
+        """
         if not posts:
-            return
+            return 0
 
         query = text("""
-            INSERT INTO posts (
-                platform,
-                external_id,
-                url,
-                title,
-                content,
-                author,
-                published_at,
-                score,
-                engagement
+            WITH batch AS (
+                SELECT *
+                FROM unnest(
+                    CAST(:platform AS VARCHAR[]),
+                    CAST(:external_id AS VARCHAR[]),
+                    CAST(:url AS VARCHAR[]),
+                    CAST(:title AS TEXT[]),
+                    CAST(:content AS TEXT[]),
+                    CAST(:author AS VARCHAR[]),
+                    CAST(:category AS VARCHAR[]),
+                    CAST(:published_at AS TIMESTAMP[]),
+                    CAST(:score AS INT[]),
+                    CAST(:reputation_bonus AS INT[]),
+                    CAST(:engagement AS TEXT[])
+                ) AS b (
+                    platform, external_id, url, title, content,
+                    author, category, published_at, score,
+                    reputation_bonus, engagement
+                )
+            ),
+            inserted AS (
+                INSERT INTO posts (
+                    platform,
+                    external_id,
+                    url,
+                    title,
+                    content,
+                    author,
+                    category,
+                    published_at,
+                    score,
+                    reputation_bonus,
+                    engagement
+                )
+                SELECT
+                    platform,
+                    external_id,
+                    url,
+                    title,
+                    content,
+                    author,
+                    category,
+                    published_at,
+                    score,
+                    reputation_bonus,
+                    CAST(engagement AS JSONB)
+                FROM batch
+                ORDER BY platform, external_id
+                ON CONFLICT (platform, external_id)
+                DO NOTHING
+                RETURNING platform, author, category,
+                          score - reputation_bonus AS base_score,
+                          COALESCE(published_at, scraped_at) AS seen_at
+            ),
+            authors AS (
+                INSERT INTO author_stats AS a (
+                    platform, author, post_count, high_intent_count,
+                    score_sum, first_seen_at, last_seen_at
+                )
+                SELECT
+                    platform,
+                    author,
+                    COUNT(*),
+                    COUNT(*) FILTER (WHERE base_score >= :high_intent_score),
+                    COALESCE(SUM(base_score), 0),
+                    MIN(seen_at),
+                    MAX(seen_at)
+                FROM inserted
+                WHERE author <> ''
+                GROUP BY platform, author
+                ORDER BY platform, author
+                ON CONFLICT (platform, author) DO UPDATE SET
+                    post_count = a.post_count + EXCLUDED.post_count,
+                    high_intent_count = a.high_intent_count + EXCLUDED.high_intent_count,
+                    score_sum = a.score_sum + EXCLUDED.score_sum,
+                    first_seen_at = LEAST(a.first_seen_at, EXCLUDED.first_seen_at),
+                    last_seen_at = GREATEST(a.last_seen_at, EXCLUDED.last_seen_at),
+                    updated_at = NOW()
+                RETURNING 1
+            ),
+            categories AS (
+                INSERT INTO category_daily_stats AS c (
+                    platform, category, day, post_count, high_intent_count, score_sum
+                )
+                SELECT
+                    platform,
+                    COALESCE(category, ''),
+                    CAST(seen_at AS DATE),
+                    COUNT(*),
+                    COUNT(*) FILTER (WHERE base_score >= :high_intent_score),
+                    COALESCE(SUM(base_score), 0)
+                FROM inserted
+                GROUP BY 1, 2, 3
+                ORDER BY 1, 2, 3
+                ON CONFLICT (platform, category, day) DO UPDATE SET
+                    post_count = c.post_count + EXCLUDED.post_count,
+                    high_intent_count = c.high_intent_count + EXCLUDED.high_intent_count,
+                    score_sum = c.score_sum + EXCLUDED.score_sum,
+                    updated_at = NOW()
+                RETURNING 1
             )
-            VALUES (
-                :platform,
-                :external_id,
-                :url,
-                :title,
-                :content_text,
-                :author,
-                :published_at,
-                :intent_score,
-                :engagement
-            )
-            ON CONFLICT (platform, external_id)
-            DO NOTHING
+            SELECT COUNT(*) FROM inserted
+        """)
+
+        rows = [p.to_row() for p in posts]
+        params = {column: [row[column] for row in rows] for column in rows[0]}
+        params["high_intent_score"] = self.high_intent_score
+
+        with metrics.timer("db_seconds", labels={"op": "insert_posts"}):
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(query, params)
+                inserted = result.scalar_one()
+                if inserted:
+                    # read caches (api.server) drop their entries on this
+                    await session.execute(
+                        text("SELECT pg_notify(:channel, :payload)"),
+                        {"channel": POSTS_CHANNEL, "payload": str(inserted)},
+                    )
+                await session.commit()
+        metrics.incr("posts_inserted", inserted)
+        return inserted
+
+    async def get_labelled_posts(self) -> List[Dict]:
+        """
+        Rows hand-labelled for training (intent_label: 1 = intent, 0 = not).
+        """
+        query = text("""
+            SELECT title, content, intent_label
+            FROM posts
+            WHERE intent_label IS NOT NULL
         """)
 
         async with AsyncSessionLocal() as session:
-            await session.execute(query, posts)
-            await session.commit()
\ No newline at end of file
+            result = await session.execute(query)
+            return [
+                {"title": row[0] or "", "content": row[1] or "", "label": int(row[2])}
+                for row in result.fetchall()
+            ]
+
+    async def query_posts(
+        self,
+        platform: Optional[str] = None,
+        category: Optional[str] = None,
+        author: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        min_score: Optional[int] = None,
+        limit: int = 50,
+        after: Optional[Tuple[int, int]] = None,
+    ) -> List[Dict]:
+        """
+        Scored posts ordered by (score, id) descending. `after` is the
+        (score, id) of the last row of the previous page (keyset pagination).
+        """
+        conditions = ["score IS NOT NULL"]
+        params: Dict = {"limit": limit}
+
+        if platform:
+            conditions.append("platform = :platform")
+            params["platform"] = platform
+        if category:
+            conditions.append("category = :category")
+            params["category"] = category
+        if author:
+            conditions.append("author = :author")
+            params["author"] = author
+        if since:
+            conditions.append("published_at >= :since")
+            params["since"] = since
+        if until:
+            conditions.append("published_at < :until")
+            params["until"] = until
+        if min_score is not None:
+            conditions.append("score >= :min_score")
+            params["min_score"] = min_score
+        if after:
+            conditions.append("(score, id) < (:after_score, :after_id)")
+            params["after_score"], params["after_id"] = after
+
+        query = text(f"""
+            SELECT {QUERY_COLUMNS}
+            FROM posts
+            WHERE {" AND ".join(conditions)}
+            ORDER BY score DESC, id DESC
+            LIMIT :limit
+        """)
+
+        with metrics.timer("db_seconds", labels={"op": "query_posts"}):
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(query, params)
+                return [dict(row._mapping) for row in result.fetchall()]
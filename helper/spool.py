@@ -0,0 +1,144 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from models.post import Post
+from utils.log_debug import log_debug
+from utils.metrics import metrics
+
+OPEN_SUFFIX = ".open"
+SEALED_SUFFIX = ".jsonl"
+
+
+# -----------------------------
+# Append-only local spool of scraped posts (JSON Lines segments)
+# -----------------------------
+class PostSpool:
+    """
+    Scraped posts are appended here before any DB or SMTP work. A segment
+    is deleted only after both downstream stages have acked it, so an
+    outage leaves it on disk to be replayed on the next start.
+    """
+
+    def __init__(self, directory: str = "spool", fsync_every: int = 50, max_segment_bytes: int = 8 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.fsync_every = fsync_every
+        self.max_segment_bytes = max_segment_bytes
+
+        self._file = None
+        self._path: Optional[Path] = None
+        self._unsynced = 0
+        self._sealed: List[Path] = []
+
+    # -----------------------------
+    # Writing
+    # -----------------------------
+    def _open_segment(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"segment-{time.strftime('%Y%m%dT%H%M%S')}-{time.time_ns() % 1_000_000_000:09d}"
+        self._path = self.directory / f"{name}{OPEN_SUFFIX}"
+        self._file = open(self._path, "ab")
+        self._unsynced = 0
+
+    def append_many(self, posts: Iterable[Post]):
+        for post in posts:
+            if self._file is None:
+                self._open_segment()
+
+            line = json.dumps(post.to_dict(), default=str, ensure_ascii=False).encode("utf-8") + b"\n"
+            self._file.write(line)
+            self._unsynced += 1
+            metrics.incr("spool_records")
+
+            if self._unsynced >= self.fsync_every:
+                self.flush()
+            if self._file.tell() >= self.max_segment_bytes:
+                self._close_segment()
+
+    def flush(self):
+        if self._file is None or not self._unsynced:
+            return
+        with metrics.timer("spool_fsync_seconds"):
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        sealed = self._path.with_suffix(SEALED_SUFFIX)
+        self._path.replace(sealed)
+        self._sealed.append(sealed)
+        self._file = None
+        self._path = None
+
+    def seal(self) -> List[Path]:
+        """
+        Fsync and close the open segment. Returns every segment sealed by
+        this writer since the last call, including ones rotated out by
+        max_segment_bytes.
+        """
+        self._close_segment()
+        sealed, self._sealed = self._sealed, []
+        return sealed
+
+    # -----------------------------
+    # Replay
+    # -----------------------------
+    def pending_segments(self) -> List[Path]:
+        """
+        Sealed segments plus segments a crashed run left open, oldest first.
+        """
+        if not self.directory.exists():
+            return []
+
+        segments = []
+        for path in self.directory.iterdir():
+            if path == self._path:
+                continue
+            if path.suffix == OPEN_SUFFIX:
+                sealed = path.with_suffix(SEALED_SUFFIX)
+                path.replace(sealed)
+                segments.append(sealed)
+            elif path.suffix == SEALED_SUFFIX:
+                segments.append(path)
+        return sorted(segments)
+
+    def read(self, segment: Path) -> List[Post]:
+        posts = []
+        with open(segment, "rb") as f:
+            for lineno, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    posts.append(Post.from_dict(json.loads(line)))
+                except (ValueError, TypeError) as e:
+                    # a torn final write from a crash; everything before it is intact
+                    log_debug(f"Skipping unreadable record {segment.name}:{lineno}: {e}")
+        return posts
+
+    def _ack_path(self, segment: Path, stage: str) -> Path:
+        return segment.with_name(f"{segment.stem}.{stage}.ack")
+
+    def get_ack(self, segment: Path, stage: str) -> Optional[Dict]:
+        path = self._ack_path(segment, stage)
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def ack(self, segment: Path, stage: str, data: Optional[Dict] = None):
+        path = self._ack_path(segment, stage)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data or {}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        tmp.replace(path)
+
+    def remove(self, segment: Path):
+        for path in segment.parent.glob(f"{segment.stem}.*"):
+            path.unlink(missing_ok=True)
@@ -0,0 +1,179 @@
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from typing import Dict, Iterable, List, Optional, Tuple
+from helper.database import AsyncSessionLocal
+from utils.metrics import metrics
+
+class StatsRepository:
+    """
+    Reads the author_stats / category_daily_stats aggregates kept up to
+    date by PostsRepository.insert_posts.
+    """
+
+    async def get_author_stats(self, platform: str, authors: List[str]) -> Dict[str, Dict]:
+        if not authors:
+            return {}
+
+        query = text("""
+            SELECT author, post_count, high_intent_count, score_sum, last_seen_at
+            FROM author_stats
+            WHERE platform = :platform
+              AND author = ANY(:authors)
+        """)
+
+        with metrics.timer("db_seconds", labels={"op": "get_author_stats"}):
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(query, {"platform": platform, "authors": authors})
+                return {
+                    row[0]: {
+                        "post_count": row[1],
+                        "high_intent_count": row[2],
+                        "avg_score": row[3] / row[1] if row[1] else 0.0,
+                        "last_seen_at": row[4],
+                    }
+                    for row in result.fetchall()
+                }
+
+    async def top_authors(
+        self,
+        platform: Optional[str] = None,
+        min_high_intent: int = 2,
+        limit: int = 50,
+    ) -> List[Dict]:
+        query = text("""
+            SELECT
+                platform,
+                author,
+                post_count,
+                high_intent_count,
+                CAST(score_sum AS FLOAT) / NULLIF(post_count, 0) AS avg_score,
+                first_seen_at,
+                last_seen_at
+            FROM author_stats
+            WHERE high_intent_count >= :min_high_intent
+              AND (CAST(:platform AS VARCHAR) IS NULL OR platform = :platform)
+            ORDER BY high_intent_count DESC, last_seen_at DESC
+            LIMIT :limit
+        """)
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                query,
+                {"platform": platform, "min_high_intent": min_high_intent, "limit": limit},
+            )
+            return [dict(row._mapping) for row in result.fetchall()]
+
+    async def category_trends(
+        self,
+        platform: Optional[str] = None,
+        category: Optional[str] = None,
+        days: int = 30,
+    ) -> List[Dict]:
+        query = text("""
+            SELECT
+                platform,
+                category,
+                day,
+                post_count,
+                high_intent_count,
+                CAST(score_sum AS FLOAT) / NULLIF(post_count, 0) AS avg_score
+            FROM category_daily_stats
+            WHERE day >= :from_day
+              AND (CAST(:platform AS VARCHAR) IS NULL OR platform = :platform)
+              AND (CAST(:category AS VARCHAR) IS NULL OR category = :category)
+            ORDER BY category, day
+        """)
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                query,
+                {
+                    "platform": platform,
+                    "category": category,
+                    "from_day": (datetime.utcnow() - timedelta(days=days)).date(),
+                },
+            )
+            return [dict(row._mapping) for row in result.fetchall()]
+
+    async def rebuild(self, high_intent_score: int):
+        """
+        Recompute both aggregates from posts. Only needed once for rows
+        inserted before the aggregates existed.
+        """
+        statements = [
+            "TRUNCATE author_stats, category_daily_stats",
+            """
+            INSERT INTO author_stats (
+                platform, author, post_count, high_intent_count,
+                score_sum, first_seen_at, last_seen_at
+            )
+            SELECT
+                platform,
+                author,
+                COUNT(*),
+                COUNT(*) FILTER (WHERE score - reputation_bonus >= :high_intent_score),
+                COALESCE(SUM(score - reputation_bonus), 0),
+                MIN(COALESCE(published_at, scraped_at)),
+                MAX(COALESCE(published_at, scraped_at))
+            FROM posts
+            WHERE author <> ''
+            GROUP BY platform, author
+            """,
+            """
+            INSERT INTO category_daily_stats (
+                platform, category, day, post_count, high_intent_count, score_sum
+            )
+            SELECT
+                platform,
+                COALESCE(category, ''),
+                CAST(COALESCE(published_at, scraped_at) AS DATE),
+                COUNT(*),
+                COUNT(*) FILTER (WHERE score - reputation_bonus >= :high_intent_score),
+                COALESCE(SUM(score - reputation_bonus), 0)
+            FROM posts
+            GROUP BY 1, 2, 3
+            """,
+        ]
+
+        async with AsyncSessionLocal() as session:
+            for sql in statements:
+                await session.execute(text(sql), {"high_intent_score": high_intent_score})
+            await session.commit()
+
+
+# -----------------------------
+# Cached author lookup for scoring
+# -----------------------------
+class AuthorReputation:
+    """
+    Per-process cache of author_stats rows. `prefetch` loads the authors
+    of a batch in one query (async); `get` is the sync lookup the scorer
+    calls.
+    """
+
+    def __init__(self, stats: StatsRepository, ttl: float = 3600.0):
+        self.stats = stats
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, str], Tuple[float, Optional[Dict]]] = {}
+
+    async def prefetch(self, posts: Iterable):
+        now = time.monotonic()
+        missing: Dict[str, set] = {}
+        for post in posts:
+            if not post.author:
+                continue
+            entry = self._entries.get((post.platform, post.author))
+            if entry is None or entry[0] < now:
+                missing.setdefault(post.platform, set()).add(post.author)
+            else:
+                metrics.incr("cache_hits", labels={"cache": "author_reputation"})
+
+        for platform, authors in missing.items():
+            found = await self.stats.get_author_stats(platform, sorted(authors))
+            for author in authors:
+                self._entries[(platform, author)] = (now + self.ttl, found.get(author))
+
+    def get(self, platform: str, author: str) -> Optional[Dict]:
+        entry = self._entries.get((platform, author))
+        return entry[1] if entry else None
@@ -1,62 +1,96 @@
+from __future__ import annotations
+
+import argparse
 import asyncio
-import yaml
+from datetime import datetime, timezone
 from pathlib import Path
-from rich.console import Console
-from rich.status import Status
-from typing import List, Dict
-from datetime import timezone
-import json
-from dotenv import load_dotenv
-import os
-
-from helper.database import check_db_connection, create_tables
-from helper.post_repo import PostsRepository
+from typing import TYPE_CHECKING, List
+
+from utils.config import AppConfig, ConfigError, env, load_config
 from utils.log_debug import log_debug
-from scrape.ninjatrader import NinjaTraderScraper
-from scrape.elitetrader import EliteTraderScraper
-from score.intent import IntentScorer
-from smtp.send import EmailSender
+from utils.metrics import metrics
+from utils.profiling import profiler
+
+# sqlalchemy, aiohttp and bs4 are imported by the commands that need them,
+# so `--help` and the lighter commands don't pay for them
+if TYPE_CHECKING:
+    from helper.post_repo import PostsRepository
+    from helper.spool import PostSpool
+    from helper.stats_repo import AuthorReputation
+    from models.post import Post
+    from score.engine import ScoringEngine
 
 # -----------------------------
-# Load .env and YAML config helper
+# Console spinner (rich is imported on first use)
 # -----------------------------
+_console = None
 
-env = os.getenv("APP_ENV", "local")
-load_dotenv(f".env.{env}")
-smtp_password = str(os.getenv("SMTP_APP_PASSWORD"))
-
-def load_yaml(path: str) -> dict:
-    with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
-
-console = Console()
+def console_status(message: str):
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console.status(message, spinner="dots")
 
 
 # -----------------------------
 # Main execution
 # -----------------------------
 async def main():
-    app_config = load_yaml("config/app.yaml")
-    email_config = load_yaml("config/email.yaml")
-    sources_config = load_yaml("config/sources.yaml")
-    keywords_config = load_yaml("config/keywords.yaml")
-    scoring_config = load_yaml("config/scoring.yaml")
-
-    if not app_config or not sources_config or not keywords_config or not scoring_config:
-        log_debug("❌ Missing configuration files. Exiting.")
+    from helper.database import check_db_connection, create_tables
+
+    try:
+        config = load_config()
+    except ConfigError as e:
+        log_debug(f"❌ {e}. Exiting.")
         return
 
     log_debug("✅ Configs loaded")
 
-    if not await check_db_connection():
-        log_debug("❌ DB not reachable. Exiting.")
-        return
+    spool = build_spool(config.app)
 
-    log_debug("✅ Database connection OK")
-    await create_tables()
-    log_debug("✅ Database tables ready")
+    db_ok = await check_db_connection()
+    if db_ok:
+        log_debug("✅ Database connection OK")
+        await create_tables()
+        log_debug("✅ Database tables ready")
+    else:
+        log_debug("❌ DB not reachable. Scraped posts stay in the spool until the next start.")
+
+    status, reason = "success", None
+    try:
+        await run_pipeline(config, spool, db_ok)
+    except Exception as e:
+        status, reason = "failed", str(e)
+        raise
+    finally:
+        await record_run_metrics(config.app, status, reason)
+
+
+def build_spool(app_config: dict) -> PostSpool:
+    from helper.spool import PostSpool
+
+    spool_config = app_config.get("spool") or {}
+    return PostSpool(
+        directory=spool_config.get("directory", "spool"),
+        fsync_every=spool_config.get("fsync_every", 50),
+        max_segment_bytes=spool_config.get("max_segment_bytes", 8 * 1024 * 1024),
+    )
+
+
+async def run_pipeline(config: AppConfig, spool: PostSpool, db_ok: bool = True):
+    from scrape.elitetrader import EliteTraderScraper
+
+    app_config = config.app
+    sources_config = config.sources
+
+    # Segments left by earlier runs are replayed while this run scrapes.
+    pending = spool.pending_segments()
+    replay = None
+    if pending and db_ok:
+        log_debug(f"Replaying {len(pending)} spooled segment(s) from earlier runs")
+        replay = asyncio.create_task(deliver_segments(config, spool, pending))
 
-    posts = []
     scraper = EliteTraderScraper(
         headers = {
             "User-Agent": app_config['app']['user_agent']
@@ -64,89 +98,307 @@ async def main():
         base_url=sources_config['elitetrader']['base_url'],
         categories=sources_config['elitetrader']['categories'],
         max_posts_per_run=sources_config['elitetrader']['max_posts_per_run'],
-        from_days_ago=app_config['app']['run_interval_days']
+        from_days_ago=app_config['app']['run_interval_days'],
+        max_concurrency=sources_config['elitetrader'].get('max_concurrency', 4)
     )
-    scraped_posts = await run_scraper(scraper)
+    try:
+        await run_scraper(scraper, on_batch=spool.append_many)
+    finally:
+        segments = spool.seal()
 
-    repo = PostsRepository()
-    external_ids = [p["external_id"] for p in posts]
-    existing_ids = await repo.get_existing_external_ids(
-        platform="elitetrader",
-        external_ids=external_ids,
-    )
-    new_posts = [
-        p for p in scraped_posts
-        if p["external_id"] not in existing_ids
-    ]
-
-    scorer = IntentScorer(
-        scoring_config=scoring_config,
-        keywords_config=keywords_config
+    if replay:
+        await replay
+
+    if not db_ok:
+        log_debug(f"Spooled {len(segments)} segment(s); delivery deferred.")
+        return
+
+    await deliver_segments(config, spool, segments)
+
+
+# -----------------------------
+# Spool -> Postgres -> email
+# -----------------------------
+async def deliver_segments(config: AppConfig, spool: PostSpool, segments: List[Path]):
+    from helper.post_repo import PostsRepository
+    from helper.stats_repo import AuthorReputation, StatsRepository
+    from score.engine import build_scorer
+
+    repo = PostsRepository(high_intent_score=high_intent_score(config.scoring))
+    reputation = AuthorReputation(StatsRepository())
+    scorer = build_scorer(
+        scoring_config=config.scoring,
+        keywords_config=config.keywords,
+        author_lookup=reputation.get,
     )
 
-    with console.status(
-        "[bold cyan]Scoring posts and sorting...[/bold cyan]",
-        spinner="dots"
-    ):
-        scored_posts = scorer.score_posts(new_posts)
-        filtered_posts = [
-            p for p in new_posts
-            if p["intent_score"] and p["intent_score"] >= scoring_config['thresholds']['minimum_score']
+    for segment in segments:
+        await deliver_segment(config, spool, segment, repo, scorer, reputation)
+
+async def deliver_segment(
+    config: AppConfig,
+    spool: PostSpool,
+    segment: Path,
+    repo: PostsRepository,
+    scorer: ScoringEngine,
+    reputation: AuthorReputation,
+):
+    minimum_score = config.scoring['thresholds']['minimum_score']
+    scraped_posts = spool.read(segment)
+
+    # The "db_pending" ack records the deduped ids before the insert: after
+    # a crash between the insert commit and the "db" ack, dedupe would see
+    # these posts as existing and the digest would be silently lost.
+    db_ack = spool.get_ack(segment, "db") or spool.get_ack(segment, "db_pending")
+    if db_ack is None:
+        new_posts = []
+        for platform in {p.platform for p in scraped_posts}:
+            platform_posts = [p for p in scraped_posts if p.platform == platform]
+            existing_ids = await repo.get_existing_external_ids(
+                platform=platform,
+                external_ids=[p.external_id for p in platform_posts],
+            )
+            new_posts.extend(p for p in platform_posts if p.external_id not in existing_ids)
+        candidates = new_posts
+        spool.ack(segment, "db_pending", {"external_ids": [p.external_id for p in candidates]})
+    else:
+        acked_ids = set(db_ack.get("external_ids", []))
+        candidates = [p for p in scraped_posts if p.external_id in acked_ids]
+
+    # no spinner here: replay runs alongside the scraping spinner
+    await reputation.prefetch(candidates)
+    with profiler.stage("score"):
+        scorer.score_posts(candidates)
+        posts = [
+            p for p in candidates
+            if p.intent_score and p.intent_score >= minimum_score
         ]
-        filtered_posts.sort(key=lambda x: x.get("intent_score", 0), reverse=True)
-        posts = filtered_posts.copy()
+        posts.sort(key=lambda x: x.intent_score, reverse=True)
+
+    # Every scored post is stored (as backfill does) so the aggregates see
+    # the full distribution; only posts above minimum_score are emailed.
+    # Stored posts are deduped out of later runs, so a thread that scored
+    # below minimum_score is not re-scored when it gathers replies.
+    if spool.get_ack(segment, "db") is None:
+        # ON CONFLICT DO NOTHING makes a repeat after a crash harmless
+        with profiler.stage("db"):
+            await repo.insert_posts(candidates)
+        spool.ack(segment, "db", {"external_ids": [p.external_id for p in candidates]})
+
+    if spool.get_ack(segment, "email") is None:
+        if posts:
+            try:
+                with profiler.stage("email"):
+                    await send_digest(config.email, posts)
+            except Exception as e:
+                # keep delivering to Postgres; the segment stays on disk
+                # without an email ack and the digest is retried next start
+                metrics.incr("email_failures")
+                log_debug(f"❌ Email for {segment.name} failed, will retry on next start: {e}")
+                return
+        else:
+            log_debug("No new posts above minimum_score to email.")
+        spool.ack(segment, "email")
+
+    spool.remove(segment)
+
+def high_intent_score(scoring_config: dict) -> int:
+    thresholds = scoring_config['thresholds']
+    return thresholds.get('high_intent_score', 2 * thresholds['minimum_score'])
+
+async def send_digest(email_config: dict, posts: List[Post]):
+    import yaml
+    from smtp.send import EmailSender
 
     sender = EmailSender(
         host=email_config["smtp"]["host"],
         port=email_config["smtp"]["port"],
         username=email_config["smtp"]["username"],
-        password=smtp_password,
+        password=env("SMTP_APP_PASSWORD"),
         sender=email_config["smtp"]["sender"],
         recipients=email_config["smtp"]["recipients"],
-    )   
-    if posts and len(posts) > 0:
-        email_body = sender._build_html(posts)
-        sender.send_email(
-            subject=f"({email_config['subject']}) - ({len(filtered_posts)}) posts",
-            posts=filtered_posts
-        )
-        normalized_posts = normalize_engagement(posts)
-        await repo.insert_posts(normalized_posts)
-
-        posts_file = Path("debug/elitetrader_posts.yaml")
-        email_file = Path("debug/posts_email.html")
-        posts_file.parent.mkdir(parents=True, exist_ok=True)
-        email_file.parent.mkdir(parents=True, exist_ok=True)
-
-        with open(posts_file, "w", encoding="utf-8") as f:
-            yaml.dump(posts, f, allow_unicode=True)
-        with open(email_file, "w", encoding="utf-8") as f:
-            f.write(email_body)
-
-        log_debug(f"Saved {len(posts)} posts to {posts_file}")
-    else: 
-        log_debug("No new posts to save.")
-
-async def run_scraper(scraper):
-    with console.status("[bold green]Scraping EliteTrader...[/bold green]", spinner="dots"):
-        posts = await scraper.scrape_posts()
-    return posts
+    )
+    email_body = sender._build_html(posts)
+    await asyncio.to_thread(
+        sender.send_email,
+        subject=f"({email_config['subject']}) - ({len(posts)}) posts",
+        posts=posts
+    )
+
+    posts_file = Path("debug/elitetrader_posts.yaml")
+    email_file = Path("debug/posts_email.html")
+    posts_file.parent.mkdir(parents=True, exist_ok=True)
+    email_file.parent.mkdir(parents=True, exist_ok=True)
 
-def normalize_engagement(posts: List[Dict]) -> List[Dict]:
-    for post in posts:
-        post["engagement"] = json.dumps({
-            "views": int(post.get("views", 0)),
-            "replies": int(post.get("replies", 0)),
-        })
-        post["published_at"] = normalize_datetime(post.get("published_at"))
+    with open(posts_file, "w", encoding="utf-8") as f:
+        yaml.dump([p.to_dict() for p in posts], f, allow_unicode=True)
+    with open(email_file, "w", encoding="utf-8") as f:
+        f.write(email_body)
+
+    log_debug(f"Saved {len(posts)} posts to {posts_file}")
+
+async def record_run_metrics(app_config: dict, status: str, reason: str = None, event_type: str = "run"):
+    metrics_config = app_config.get("metrics") or {}
+    summary = metrics.summary()
+
+    log_debug(
+        f"Run {status}: {summary['pages_fetched']} pages, "
+        f"{summary['bytes_downloaded']} bytes, "
+        f"{summary['pages_per_second']} pages/s, "
+        f"p95 fetch {summary['fetch_p95_seconds']}s"
+    )
+
+    prometheus_file = metrics_config.get("prometheus_file")
+    if prometheus_file:
+        metrics.write_prometheus(prometheus_file)
+
+    if metrics_config.get("store_run_log", True):
+        try:
+            from helper.log_repo import LogsRepository
+
+            await LogsRepository().insert_log(
+                event_type=event_type,
+                event_status=status,
+                reason=reason,
+                metadata=summary,
+            )
+        except Exception as e:
+            log_debug(f"Failed to store run metrics: {e}")
+
+# -----------------------------
+# Backfill (historical crawl)
+# -----------------------------
+async def backfill(args):
+    from helper.backfill_repo import BackfillRepository
+    from helper.database import check_db_connection, create_tables
+    from helper.post_repo import PostsRepository
+    from helper.stats_repo import AuthorReputation, StatsRepository
+    from scrape.backfill import Backfiller
+    from scrape.elitetrader import EliteTraderScraper
+    from score.engine import build_scorer
+
+    try:
+        config = load_config()
+    except ConfigError as e:
+        log_debug(f"❌ {e}. Exiting.")
+        return
+
+    if not await check_db_connection():
+        log_debug("❌ DB not reachable. Exiting.")
+        return
+    await create_tables()
+
+    source = config.sources['elitetrader']
+    backfill_config = source.get('backfill') or {}
+
+    categories = source['categories']
+    if args.category:
+        categories = [c for c in categories if c['name'] == args.category]
+        if not categories:
+            log_debug(f"❌ Unknown category: {args.category}")
+            return
+
+    since = None
+    if args.since:
+        since = datetime.fromisoformat(args.since)
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+
+    scraper = EliteTraderScraper(
+        headers = {
+            "User-Agent": config.app['app']['user_agent']
+        },
+        base_url=source['base_url'],
+        categories=categories,
+        max_posts_per_run=0,
+        max_concurrency=args.concurrency or backfill_config.get('max_concurrency', 4),
+        rate_limit=args.rate or backfill_config.get('rate_limit'),
+    )
+    reputation = AuthorReputation(StatsRepository())
+    backfiller = Backfiller(
+        scraper=scraper,
+        scorer=build_scorer(
+            scoring_config=config.scoring,
+            keywords_config=config.keywords,
+            author_lookup=reputation.get,
+        ),
+        queue=BackfillRepository(
+            platform="elitetrader",
+            stale_after=backfill_config.get('stale_claim_seconds', 1800),
+        ),
+        repo=PostsRepository(high_intent_score=high_intent_score(config.scoring)),
+        reputation=reputation,
+        workers=args.workers or backfill_config.get('workers', 4),
+        since=since,
+        retry_failed=args.retry_failed,
+    )
+
+    status, reason = "success", None
+    try:
+        for category in categories:
+            await backfiller.run(category['url'], from_page=args.from_page, to_page=args.to_page)
+    except Exception as e:
+        status, reason = "failed", str(e)
+        raise
+    finally:
+        await record_run_metrics(config.app, status, reason, event_type="backfill")
+
+async def rebuild_stats():
+    from helper.database import check_db_connection, create_tables
+    from helper.stats_repo import StatsRepository
+
+    try:
+        config = load_config()
+    except ConfigError as e:
+        log_debug(f"❌ {e}. Exiting.")
+        return
+
+    if not await check_db_connection():
+        log_debug("❌ DB not reachable. Exiting.")
+        return
+    await create_tables()
+
+    await StatsRepository().rebuild(high_intent_score(config.scoring))
+    log_debug("✅ Rebuilt author_stats and category_daily_stats from posts")
+
+async def run_scraper(scraper, on_batch=None):
+    with console_status("[bold green]Scraping EliteTrader...[/bold green]"), profiler.stage("scrape"):
+        posts = await scraper.scrape_posts(on_batch=on_batch)
     return posts
 
-def normalize_datetime(dt):
-    if dt is None:
-        return None
-    if dt.tzinfo:
-        return dt.astimezone(timezone.utc).replace(tzinfo=None)
-    return dt
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape, score and email forum posts.")
+    parser.add_argument("--profile", action="store_true", help="profile each pipeline stage into debug/profile/ (also: POSTS_PROFILE=1)")
+    parser.add_argument("--profile-mode", choices=("sample", "cprofile"), default="sample")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("run", help="regular incremental run (default)")
+
+    backfill_parser = commands.add_parser("backfill", help="crawl a category's history into the database")
+    backfill_parser.add_argument("--category", help="category name from sources.yaml (default: all)")
+    backfill_parser.add_argument("--from-page", type=int, default=1)
+    backfill_parser.add_argument("--to-page", type=int, help="last page (default: detected from the listing)")
+    backfill_parser.add_argument("--since", help="skip threads last active before this ISO date")
+    backfill_parser.add_argument("--workers", type=int, help="concurrent page workers")
+    backfill_parser.add_argument("--concurrency", type=int, help="max in-flight requests per host")
+    backfill_parser.add_argument("--rate", type=float, help="max requests per second per host")
+    backfill_parser.add_argument("--retry-failed", action="store_true", help="requeue pages that used up their attempts")
+
+    commands.add_parser("rebuild-stats", help="recompute author/category aggregates from posts")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    args = parse_args()
+    if args.profile:
+        profiler.enable(mode=args.profile_mode, run_name=args.command or "run")
+    else:
+        profiler.enable_from_env(run_name=args.command or "run")
+
+    try:
+        if args.command == "backfill":
+            asyncio.run(backfill(args))
+        elif args.command == "rebuild-stats":
+            asyncio.run(rebuild_stats())
+        else:
+            asyncio.run(main())
+    finally:
+        profiler.stop()
\ No newline at end of file
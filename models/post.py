@@ -1,16 +1,63 @@
-from pydantic import BaseModel, HttpUrl
-from typing import Optional, Dict
+import json
+from dataclasses import dataclass, field, asdict
+from typing import Optional, List, Dict
 from datetime import datetime
 
-class Post(BaseModel):
+from utils.time_convert import normalize_datetime
+
+
+# -----------------------------
+# Post record passed scraper -> scorer -> email -> repository
+# -----------------------------
+@dataclass(slots=True)
+class Post:
     platform: str
-    url: HttpUrl
     external_id: str
-    title: str
-    content: str
-    author: str
-    published_at: datetime
-    engagement: Optional[Dict[str, int]] = None
+    url: str
+    title: str = ""
+    content: str = ""
+    author: str = ""
+    category: str = ""
+    replies: int = 0
+    views: int = 0
+    published_at: Optional[datetime] = None
+    intent_score: int = 0
+    intent_reasons: List[str] = field(default_factory=list)
+    # part of intent_score that came from the author's reputation
+    reputation_bonus: int = 0
     summary: Optional[str] = None
-    score: Optional[int] = None
-    suggested_replies: Optional[str] = None
\ No newline at end of file
+
+    def engagement(self) -> Dict[str, int]:
+        return {
+            "views": int(self.views),
+            "replies": int(self.replies),
+        }
+
+    def to_row(self) -> Dict:
+        """
+        Flatten into the bind parameters used by PostsRepository.
+        Engagement is JSON-encoded here and nowhere else.
+        """
+        return {
+            "platform": self.platform,
+            "external_id": self.external_id,
+            "url": self.url,
+            "title": self.title,
+            "content": self.content,
+            "author": self.author,
+            "category": self.category,
+            "published_at": normalize_datetime(self.published_at),
+            "score": self.intent_score,
+            "reputation_bonus": self.reputation_bonus,
+            "engagement": json.dumps(self.engagement()),
+        }
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Post":
+        published_at = data.get("published_at")
+        if isinstance(published_at, str):
+            data = {**data, "published_at": datetime.fromisoformat(published_at)}
+        return cls(**data)
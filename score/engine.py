@@ -0,0 +1,48 @@
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
+from models.post import Post
+
+AuthorLookup = Callable[[str, str], Optional[Dict]]
+
+
+# -----------------------------
+# Scoring engine interface
+# -----------------------------
+class ScoringEngine(ABC):
+    """
+    Sets `intent_score` and `intent_reasons` on each post in place and
+    returns the same list.
+    """
+
+    def __init__(self, author_lookup: Optional[AuthorLookup] = None):
+        # (platform, author) -> author_stats dict, e.g. AuthorReputation.get;
+        # the caller prefetches each batch's authors before scoring it
+        self.author_lookup = author_lookup
+
+    @abstractmethod
+    def score_posts(self, posts: List[Post]) -> List[Post]:
+        ...
+
+
+def build_scorer(
+    scoring_config: dict,
+    keywords_config: dict,
+    author_lookup: Optional[AuthorLookup] = None,
+) -> ScoringEngine:
+    engine = scoring_config.get("engine", "keywords")
+
+    if engine == "keywords":
+        from score.intent import IntentScorer
+        return IntentScorer(
+            scoring_config=scoring_config,
+            keywords_config=keywords_config,
+            author_lookup=author_lookup,
+        )
+
+    if engine == "linear":
+        # text-only model: no author reputation bonus
+        from score.linear import LinearIntentScorer
+        return LinearIntentScorer.from_config(scoring_config)
+
+    raise ValueError(f"Unknown scoring engine: {engine}")
@@ -1,7 +1,13 @@
 import re
-from typing import Dict, List
-class IntentScorer:
-    def __init__(self, scoring_config: dict, keywords_config: dict):
+from typing import List, Optional
+
+from models.post import Post
+from score.engine import AuthorLookup, ScoringEngine
+from utils.metrics import metrics
+
+class IntentScorer(ScoringEngine):
+    def __init__(self, scoring_config: dict, keywords_config: dict, author_lookup: Optional[AuthorLookup] = None):
+        super().__init__(author_lookup)
         self.scoring = scoring_config
         self.keywords = keywords_config
 
@@ -14,16 +20,20 @@ class IntentScorer:
         self.positive = keywords_config.get("positive", {})
         self.negative = keywords_config.get("negative", {})
 
-    def score_posts(self, posts: List[Dict]) -> List[Dict]:
-        for post in posts:
-            score, reasons = self.score_single_post(post)
-            post["intent_score"] = score
-            post["intent_reasons"] = reasons
+    def score_posts(self, posts: List[Post]) -> List[Post]:
+        with metrics.timer("score_seconds"):
+            for post in posts:
+                score, reasons = self.score_single_post(post)
+                bonus, bonus_reasons = self._reputation_score(post)
+                post.intent_score = score + bonus
+                post.intent_reasons = reasons + bonus_reasons
+                post.reputation_bonus = bonus
+        metrics.incr("posts_scored", len(posts))
         return posts
 
-    def score_single_post(self, post: Dict):
-        title = post.get("title", "").lower()
-        content = post.get("content_text", "").lower()
+    def score_single_post(self, post: Post):
+        title = (post.title or "").lower()
+        content = (post.content or "").lower()
 
         score = 0
         reasons = []
@@ -75,7 +85,7 @@ class IntentScorer:
     # -----------------------------
     # Structural bonuses
     # -----------------------------
-    def _structural_score(self, post: Dict, content: str):
+    def _structural_score(self, post: Post, content: str):
         score = 0
         reasons = []
 
@@ -105,7 +115,7 @@ class IntentScorer:
             if s:
                 reasons.append(f"+{s} equity_stats")
 
-        replies = post.get("replies", 0)
+        replies = post.replies
         if replies >= 10:
             s = self.structural.get("comment_count_gt_10", 0)
             score += s
@@ -114,6 +124,21 @@ class IntentScorer:
 
         return score, reasons
 
+    # -----------------------------
+    # Author reputation (kept apart so aggregates can exclude it)
+    # -----------------------------
+    def _reputation_score(self, post: Post):
+        if not self.author_lookup or not post.author:
+            return 0, []
+
+        stats = self.author_lookup(post.platform, post.author)
+        min_posts = self.thresholds.get("author_high_intent_posts", 3)
+        if not stats or stats["high_intent_count"] < min_posts:
+            return 0, []
+
+        s = self.structural.get("repeat_high_intent_author", 0)
+        return s, ([f"+{s} repeat_author"] if s else [])
+
     def _contains_code(self, text: str) -> bool:
         return bool(re.search(r"(<code>|```|def |class |;)", text))
 
@@ -0,0 +1,171 @@
+import re
+import zlib
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from models.post import Post
+from score.engine import ScoringEngine
+from utils.metrics import metrics
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9'\-]*")
+
+
+# -----------------------------
+# Hashed word n-gram features
+# -----------------------------
+class HashedNgramFeaturizer:
+    """
+    Binary presence of word n-grams, hashed into `2 ** bits` buckets.
+    Title and content grams are separate features. The same featurizer
+    is used for training (score/train_linear.py) and inference.
+    """
+
+    def __init__(self, bits: int = 18, ngram_max: int = 2, cache_size: int = 200_000):
+        self.bits = bits
+        self.dim = 1 << bits
+        self.mask = self.dim - 1
+        self.ngram_max = ngram_max
+        self.cache_size = cache_size
+        self._index_cache: Dict[str, int] = {}
+
+    def _index(self, feature: str) -> int:
+        idx = self._index_cache.get(feature)
+        if idx is None:
+            idx = zlib.crc32(feature.encode("utf-8")) & self.mask
+            if len(self._index_cache) < self.cache_size:
+                self._index_cache[feature] = idx
+        return idx
+
+    def _grams(self, text: str) -> List[str]:
+        tokens = TOKEN_RE.findall(text.lower())
+        grams = list(tokens)
+        for n in range(2, self.ngram_max + 1):
+            grams.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return grams
+
+    def features(self, title: str, content: str) -> Tuple[List[int], List[str]]:
+        """
+        Returns unique bucket indices and, per index, the feature name it
+        came from (first one wins on collisions).
+        """
+        seen: Dict[int, str] = {}
+        for prefix, text in (("title", title), ("content", content)):
+            for gram in self._grams(text or ""):
+                feature = f"{prefix}:{gram}"
+                idx = self._index(feature)
+                if idx not in seen:
+                    seen[idx] = feature
+        return list(seen.keys()), list(seen.values())
+
+
+# -----------------------------
+# Linear model scoring engine
+# -----------------------------
+class LinearIntentScorer(ScoringEngine):
+    """
+    intent_score = round(scale * (bias + sum of weights of present
+    features)); each term is reported in intent_reasons in the same
+    "+N title:phrase" / "-N penalty:phrase" form as IntentScorer.
+    """
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        bias: float,
+        featurizer: HashedNgramFeaturizer,
+        score_scale: float = 5.0,
+        max_reasons: int = 8,
+    ):
+        super().__init__()
+        self.weights = weights.astype(np.float32, copy=False)
+        self.bias = float(bias)
+        self.featurizer = featurizer
+        self.score_scale = score_scale
+        self.max_reasons = max_reasons
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "LinearIntentScorer":
+        data = np.load(path)
+        featurizer = HashedNgramFeaturizer(
+            bits=int(data["bits"]),
+            ngram_max=int(data["ngram_max"]),
+        )
+        return cls(data["weights"], float(data["bias"]), featurizer, **kwargs)
+
+    @classmethod
+    def from_config(cls, scoring_config: dict) -> "LinearIntentScorer":
+        linear = scoring_config.get("linear") or {}
+        model_path = Path(linear.get("model_path", "score/intent_linear.npz"))
+        if not model_path.exists():
+            raise FileNotFoundError(
+                f"Linear intent model not found at {model_path}; train it with python -m score.train_linear"
+            )
+        return cls.load(
+            str(model_path),
+            score_scale=linear.get("score_scale", 5.0),
+            max_reasons=linear.get("max_reasons", 8),
+        )
+
+    def save(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            weights=self.weights,
+            bias=np.float32(self.bias),
+            bits=np.int32(self.featurizer.bits),
+            ngram_max=np.int32(self.featurizer.ngram_max),
+        )
+
+    def score_posts(self, posts: List[Post]) -> List[Post]:
+        if not posts:
+            return posts
+
+        with metrics.timer("score_seconds"):
+            indices: List[int] = []
+            owners: List[int] = []
+            names: List[List[str]] = []
+            offsets = [0]
+
+            for i, post in enumerate(posts):
+                idx, feature_names = self.featurizer.features(post.title, post.content)
+                indices.extend(idx)
+                owners.extend([i] * len(idx))
+                names.append(feature_names)
+                offsets.append(offsets[-1] + len(idx))
+
+            idx_arr = np.asarray(indices, dtype=np.int64)
+            contrib = self.weights[idx_arr] * self.score_scale
+            margins = np.bincount(
+                np.asarray(owners, dtype=np.int64),
+                weights=contrib,
+                minlength=len(posts),
+            ) + self.bias * self.score_scale
+
+            for i, post in enumerate(posts):
+                start, end = offsets[i], offsets[i + 1]
+                post.intent_score = int(round(margins[i]))
+                post.intent_reasons = self._reasons(contrib[start:end], names[i])
+
+        metrics.incr("posts_scored", len(posts))
+        return posts
+
+    def _reasons(self, contrib: np.ndarray, feature_names: List[str]) -> List[str]:
+        if not len(contrib):
+            return []
+        k = min(self.max_reasons, len(contrib))
+        top = np.argpartition(-np.abs(contrib), k - 1)[:k]
+        top = top[np.argsort(-np.abs(contrib[top]))]
+
+        reasons = []
+        for j in top:
+            value = round(float(contrib[j]), 1)
+            if value == 0:
+                continue
+            if value > 0:
+                reasons.append(f"+{value} {feature_names[j]}")
+            else:
+                prefix, _, gram = feature_names[j].partition(":")
+                reasons.append(f"{value} penalty:{gram}")
+        return reasons
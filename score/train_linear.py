@@ -0,0 +1,71 @@
+import argparse
+import asyncio
+from typing import Dict, List
+
+import numpy as np
+
+from score.linear import HashedNgramFeaturizer, LinearIntentScorer
+from utils.config import load_config
+from utils.log_debug import log_debug
+
+
+def build_matrix(rows: List[Dict], featurizer: HashedNgramFeaturizer):
+    from scipy.sparse import csr_matrix
+
+    indices: List[int] = []
+    indptr = [0]
+    for row in rows:
+        idx, _ = featurizer.features(row["title"], row["content"])
+        indices.extend(idx)
+        indptr.append(len(indices))
+
+    data = np.ones(len(indices), dtype=np.float32)
+    return csr_matrix((data, indices, indptr), shape=(len(rows), featurizer.dim))
+
+
+def train(rows: List[Dict], bits: int, ngram_max: int, c: float) -> LinearIntentScorer:
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import cross_val_score
+
+    featurizer = HashedNgramFeaturizer(bits=bits, ngram_max=ngram_max)
+    X = build_matrix(rows, featurizer)
+    y = np.asarray([1 if r["label"] > 0 else 0 for r in rows])
+
+    model = LogisticRegression(C=c, solver="liblinear", class_weight="balanced")
+    if len(set(y)) > 1 and min(np.bincount(y)) >= 5:
+        auc = cross_val_score(model, X, y, cv=5, scoring="roc_auc")
+        log_debug(f"5-fold ROC AUC: {auc.mean():.3f} ± {auc.std():.3f}")
+
+    model.fit(X, y)
+    return LinearIntentScorer(model.coef_[0], model.intercept_[0], featurizer)
+
+
+async def load_rows() -> List[Dict]:
+    from helper.post_repo import PostsRepository
+    return await PostsRepository().get_labelled_posts()
+
+
+def main(argv=None):
+    linear_config = load_config().scoring.get("linear") or {}
+
+    parser = argparse.ArgumentParser(description="Train the hashed n-gram intent model from labelled posts.")
+    parser.add_argument("--out", default=linear_config.get("model_path", "score/intent_linear.npz"))
+    parser.add_argument("--bits", type=int, default=18)
+    parser.add_argument("--ngram-max", type=int, default=2)
+    parser.add_argument("--c", type=float, default=1.0, help="inverse regularization strength")
+    args = parser.parse_args(argv)
+
+    rows = asyncio.run(load_rows())
+    labels = [r["label"] > 0 for r in rows]
+    if not rows or all(labels) or not any(labels):
+        log_debug("❌ Need labelled posts of both classes (posts.intent_label = 0/1). Exiting.")
+        return
+
+    log_debug(f"Training on {len(rows)} labelled posts ({sum(labels)} positive)")
+    scorer = train(rows, args.bits, args.ngram_max, args.c)
+    scorer.save(args.out)
+    log_debug(f"✅ Saved model to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
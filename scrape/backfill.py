@@ -0,0 +1,180 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from helper.backfill_repo import BackfillRepository
+from helper.post_repo import PostsRepository
+from helper.stats_repo import AuthorReputation
+from models.post import Post
+from scrape.elitetrader import EliteTraderScraper
+from scrape.fetch import FetchClient
+from score.engine import ScoringEngine
+from utils.log_debug import log_debug
+from utils.metrics import metrics
+from utils.profiling import profiler
+
+
+class PageFailed(Exception):
+    pass
+
+
+# -----------------------------
+# Parallel, resumable historical crawl of one category
+# -----------------------------
+class Backfiller:
+    def __init__(
+        self,
+        scraper: EliteTraderScraper,
+        scorer: ScoringEngine,
+        queue: BackfillRepository,
+        repo: PostsRepository,
+        reputation: Optional[AuthorReputation] = None,
+        workers: int = 4,
+        since: Optional[datetime] = None,
+        progress_interval: float = 30.0,
+        retry_failed: bool = False,
+    ):
+        self.scraper = scraper
+        self.scorer = scorer
+        self.queue = queue
+        self.repo = repo
+        # prefetched per page; the scorer was built with reputation.get
+        self.reputation = reputation
+        self.workers = workers
+        self.since = since
+        self.progress_interval = progress_interval
+        self.retry_failed = retry_failed
+
+    async def run(self, category_url: str, from_page: int = 1, to_page: Optional[int] = None):
+        category_url = category_url.rstrip("/")
+
+        async with self.scraper._session() as session:
+            client = self.scraper._client(session)
+
+            if to_page is None:
+                to_page = await self._detect_last_page(client, category_url)
+                if to_page is None:
+                    log_debug(f"❌ Could not load {category_url}. Backfill aborted.")
+                    return
+
+            await self.queue.enqueue_pages(category_url, from_page, to_page)
+            requeued = await self.queue.requeue_in_progress(category_url)
+            if requeued:
+                log_debug(f"Resuming {requeued} pages left in progress by a previous run")
+            if self.retry_failed:
+                retried = await self.queue.requeue_failed(category_url)
+                if retried:
+                    log_debug(f"Retrying {retried} pages that exhausted their attempts")
+
+            progress = await self.queue.progress(category_url)
+            log_debug(f"Backfill {category_url} pages {from_page}-{to_page}: {progress}")
+
+            # counters are process-wide; report only this run's share
+            baseline = self._totals()
+            started = time.perf_counter()
+            reporter = asyncio.create_task(self._report(started, baseline))
+            try:
+                await asyncio.gather(*(
+                    self._worker(f"worker-{i}", client, category_url)
+                    for i in range(self.workers)
+                ))
+            finally:
+                reporter.cancel()
+
+        elapsed = time.perf_counter() - started
+        pages, posts = self._totals(baseline)
+        log_debug(
+            f"Backfill finished: {int(pages)} pages, {int(posts)} posts in {elapsed:.1f}s "
+            f"({pages / elapsed:.2f} pages/s, {posts / elapsed:.2f} posts/s)"
+        )
+        log_debug(f"Queue state: {await self.queue.progress(category_url)}")
+
+    async def _detect_last_page(self, client: FetchClient, category_url: str) -> Optional[int]:
+        html = await self.scraper._fetch(client, category_url)
+        if not html:
+            return None
+        with metrics.timer("parse_seconds", labels={"page": "listing"}), profiler.stage("parse"):
+            soup = BeautifulSoup(html, "html.parser")
+        return self.scraper._get_last_page_number(soup)
+
+    @staticmethod
+    def _totals(baseline: Tuple[float, float] = (0.0, 0.0)) -> Tuple[float, float]:
+        return (
+            metrics.counter("backfill_pages_done") - baseline[0],
+            metrics.counter("backfill_posts") - baseline[1],
+        )
+
+    async def _report(self, started: float, baseline: Tuple[float, float]):
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            elapsed = time.perf_counter() - started
+            pages, posts = self._totals(baseline)
+            log_debug(
+                f"Backfill progress: {int(pages)} pages, {int(posts)} posts, "
+                f"{pages / elapsed:.2f} pages/s, p95 fetch {metrics.percentile('fetch_seconds', 0.95):.2f}s"
+            )
+
+    async def _worker(self, name: str, client: FetchClient, category_url: str):
+        while True:
+            job = await self.queue.claim_page(category_url, name)
+            if job is None:
+                return
+
+            try:
+                posts = await self._scrape_page(client, category_url, job["page"])
+            except Exception as e:
+                wait = client.circuit_wait(category_url)
+                if wait:
+                    # The host is rejecting requests: the page never got a
+                    # real attempt, so hand it back and wait for the breaker.
+                    await self.queue.release_page(job["id"])
+                    log_debug(f"{name}: circuit open, pausing {wait:.0f}s")
+                    await asyncio.sleep(wait)
+                    continue
+                log_debug(f"{name}: page {job['page']} failed: {e}")
+                await self.queue.fail_page(job["id"], str(e))
+                continue
+
+            await self.queue.complete_page(job["id"], len(posts))
+            metrics.incr("backfill_pages_done")
+            metrics.incr("backfill_posts", len(posts))
+
+    async def _scrape_page(self, client: FetchClient, category_url: str, page: int) -> List[Post]:
+        page_url = category_url if page == 1 else f"{category_url}/page-{page}"
+        html = await self.scraper._fetch(client, page_url)
+        if not html:
+            raise PageFailed("listing fetch failed")
+
+        with metrics.timer("parse_seconds", labels={"page": "listing"}), profiler.stage("parse"):
+            soup = BeautifulSoup(html, "html.parser")
+            items = soup.select("div.structItem.structItem--thread")
+            posts = [p for p in map(self.scraper._parse_listing_item, items) if p]
+        soup.decompose()
+
+        if self.since:
+            posts = [p for p in posts if p.published_at >= self.since]
+
+        existing_ids = await self.repo.get_existing_external_ids(
+            platform="elitetrader",
+            external_ids=[p.external_id for p in posts],
+        )
+        posts = [p for p in posts if p.external_id not in existing_ids]
+        if not posts:
+            return posts
+
+        # Posts are deduped by external_id, so inserting one without its
+        # content would leave it empty for good; retry the page instead.
+        failed = await self.scraper._fill_content(client, posts)
+        if failed:
+            raise PageFailed(f"{len(failed)} of {len(posts)} thread fetches failed")
+
+        if self.reputation:
+            await self.reputation.prefetch(posts)
+        with profiler.stage("score"):
+            self.scorer.score_posts(posts)
+        with profiler.stage("db"):
+            await self.repo.insert_posts(posts)
+        return posts
@@ -1,11 +1,23 @@
 import asyncio
 import aiohttp
 import re
-from bs4 import BeautifulSoup
-from typing import List, Dict
+from bs4 import BeautifulSoup, SoupStrainer
+from typing import Callable, List, Dict, Optional
 from datetime import datetime, timedelta, timezone
 
+from models.post import Post
+from scrape.fetch import FetchClient
 from utils.log_debug import log_debug
+from utils.metrics import metrics
+from utils.profiling import profiler
+
+
+FIRST_POST_MARKER = b'<article class="message message--post'
+FIRST_POST_STRAINER = SoupStrainer("article", class_="message--post")
+
+
+def loop_time() -> float:
+    return asyncio.get_running_loop().time()
 
 
 class EliteTraderScraper:
@@ -18,7 +30,11 @@ class EliteTraderScraper:
         from_days_ago: int = 1,
         timeout: int = 15,
         max_retries: int = 3,
-        delay: float = 1.2
+        delay: float = 1.2,
+        max_concurrency: int = 4,
+        max_content_chars: int = 20_000,
+        max_thread_bytes: int = 2 * 1024 * 1024,
+        rate_limit: Optional[float] = None
     ):
         self.headers = headers
         self.base_url = base_url.rstrip("/")
@@ -28,16 +44,34 @@ class EliteTraderScraper:
         self.timeout = timeout
         self.max_retries = max_retries
         self.delay = delay
+        self.max_concurrency = max_concurrency
+        self.max_content_chars = max_content_chars
+        self.max_thread_bytes = max_thread_bytes
+        self.rate_limit = rate_limit
+
+    async def _fetch(self, client: FetchClient, url: str, **kwargs) -> str:
+        return await client.get_text(url, **kwargs)
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
 
-    async def _fetch(self, session: aiohttp.ClientSession, url: str) -> str:
-        for attempt in range(self.max_retries):
-            try:
-                async with session.get(url, timeout=self.timeout) as resp:
-                    if resp.status == 200:
-                        return await resp.text()
-            except Exception:
-                await asyncio.sleep(self.delay * (attempt + 1))
-        return ""
+        async def on_dns_start(session, ctx, params):
+            ctx.dns_started = loop_time()
+
+        async def on_dns_end(session, ctx, params):
+            metrics.observe("dns_seconds", loop_time() - ctx.dns_started)
+
+        async def on_connect_start(session, ctx, params):
+            ctx.connect_started = loop_time()
+
+        async def on_connect_end(session, ctx, params):
+            metrics.observe("connect_seconds", loop_time() - ctx.connect_started)
+
+        trace.on_dns_resolvehost_start.append(on_dns_start)
+        trace.on_dns_resolvehost_end.append(on_dns_end)
+        trace.on_connection_create_start.append(on_connect_start)
+        trace.on_connection_create_end.append(on_connect_end)
+        return trace
 
     def _get_last_page_number(self, soup: BeautifulSoup) -> int:
         pages = []
@@ -47,151 +81,201 @@ class EliteTraderScraper:
                 pages.append(int(t))
         return max(pages) if pages else 1
 
-    async def _scrape_thread(self, session: aiohttp.ClientSession, url: str) -> Dict:
-        html = await self._fetch(session, url)
+    async def _scrape_thread(self, client: FetchClient, url: str) -> Optional[Dict]:
+        # Only the opening post is needed: stop the download where the
+        # second post starts and build a tree for the first article only.
+        html = await self._fetch(
+            client,
+            url,
+            stop_marker=FIRST_POST_MARKER,
+            stop_count=2,
+            max_bytes=self.max_thread_bytes,
+        )
         if not html:
-            return {}
+            return None
 
-        soup = BeautifulSoup(html, "html.parser")
+        with metrics.timer("parse_seconds", labels={"page": "thread"}), profiler.stage("parse"):
+            soup = BeautifulSoup(html, "html.parser", parse_only=FIRST_POST_STRAINER)
+        del html
 
         message = soup.select_one("article.message--post")
-        if not message:
-            return {}
-
-        body = message.select_one("div.bbWrapper")
-        content_html = str(body) if body else ""
+        body = message.select_one("div.bbWrapper") if message else None
         if not body:
+            soup.decompose()
             return {}
 
-        for quote in body.select("blockquote"):
-            quote.decompose()
-
-        for tag in body.select("script, style"):
+        for tag in body.select("blockquote, script, style"):
             tag.decompose()
 
         content_text = body.get_text(separator="\n", strip=True)
+        soup.decompose()
+
+        if self.max_content_chars and len(content_text) > self.max_content_chars:
+            content_text = content_text[:self.max_content_chars]
 
         return {
-            "content_html": content_html,
             "content_text": content_text
         }
 
-    async def scrape_posts(self) -> List[Dict]:
-        posts: List[Dict] = []
+    def _parse_listing_item(self, item) -> Optional[Post]:
+        link = item.select_one("div.structItem-title a[href*='/threads/']")
+        if not link:
+            return None
+
+        title = link.get_text(strip=True)
+        href = link.get("href", "")
+        match = re.search(r"\.(\d+)/?$", href)
+        if not match:
+            return None
+
+        external_id = match.group(1)
+        post_url = href if href.startswith("http") else f"{self.base_url}{href}"
+        author_tag = item.select_one("ul.structItem-parts a.username")
+        author = author_tag.get_text(strip=True) if author_tag else ""
+        category_tag = None
+        for li in item.select("ul.structItem-parts li a"):
+            href = li.get("href", "")
+            if "/forums/" in href:
+                category_tag = li
+                break
+
+        category_name = category_tag.get_text(strip=True) if category_tag else ""
+        replies = 0
+        views = 0
+
+        for pair in item.select("div.structItem-cell--meta dl.pairs"):
+            dt = pair.select_one("dt")
+            dd = pair.select_one("dd")
+            if not dt or not dd:
+                continue
+
+            label = dt.get_text(strip=True).lower()
+            value = self._parse_count(dd.get_text())
+
+            if label == "replies":
+                replies = value
+            elif label == "views":
+                views = value
+
+        time_tag = item.select_one("time.structItem-latestDate")
+        if time_tag and time_tag.has_attr("datetime"):
+            published_at = datetime.fromisoformat(
+                time_tag["datetime"]
+            ).astimezone(timezone.utc)
+
+        else:
+            published_at = datetime.now(timezone.utc)
+
+        return Post(
+            platform="elitetrader",
+            external_id=external_id,
+            url=post_url,
+            category=category_name,
+            title=title,
+            author=author,
+            replies=replies,
+            views=views,
+            published_at=published_at,
+        )
+
+    async def _fill_content(self, client: FetchClient, posts: List[Post]) -> List[Post]:
+        """
+        Returns the posts whose thread page could not be fetched; their
+        content is left empty.
+        """
+        contents = await asyncio.gather(
+            *(self._scrape_thread(client, post.url) for post in posts)
+        )
+        failed = []
+        for post, content in zip(posts, contents):
+            if content is None:
+                failed.append(post)
+            post.content = content.get("content_text", "") if content else ""
+        return failed
+
+    def _client(self, session: aiohttp.ClientSession) -> FetchClient:
+        return FetchClient(
+            session,
+            max_retries=self.max_retries,
+            backoff_base=self.delay,
+            max_concurrency=self.max_concurrency,
+            rate_limit=self.rate_limit,
+        )
+
+    def _session(self) -> aiohttp.ClientSession:
+        return aiohttp.ClientSession(
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+            trace_configs=[self._trace_config()]
+        )
+
+    async def scrape_posts(self, on_batch: Optional[Callable[[List[Post]], None]] = None) -> List[Post]:
+        """
+        `on_batch` is called with each listing page's posts as soon as
+        their content is fetched, before the crawl moves on.
+        """
+        posts: List[Post] = []
         cutoff = datetime.now(timezone.utc) - timedelta(days=self.from_days_ago)
 
-        timeout = aiohttp.ClientTimeout(total=self.timeout)
-        connector = aiohttp.TCPConnector(limit=4)
-
-        async with aiohttp.ClientSession(
-            headers=self.headers,
-            timeout=timeout,
-            connector=connector
-        ) as session:
+        async with self._session() as session:
+            client = self._client(session)
 
             for category in self.categories:
                 base_url = category["url"].rstrip("/")
 
-                html = await self._fetch(session, base_url)
+                html = await self._fetch(client, base_url)
                 if not html:
                     continue
 
-                soup = BeautifulSoup(html, "html.parser")
+                with metrics.timer("parse_seconds", labels={"page": "listing"}), profiler.stage("parse"):
+                    soup = BeautifulSoup(html, "html.parser")
                 last_page = self._get_last_page_number(soup)
                 log_debug(f"Total pages detected: {last_page}")
 
                 for page in range(1, last_page + 1):
                     page_url = base_url if page == 1 else f"{base_url}/page-{page}"
-                    html = await self._fetch(session, page_url)
+                    html = await self._fetch(client, page_url)
                     if not html:
-                        break
+                        log_debug(f"Skipping listing page {page_url} after failed fetch")
+                        continue
 
-                    soup = BeautifulSoup(html, "html.parser")
-                    items = soup.select("div.structItem.structItem--thread")
+                    with metrics.timer("parse_seconds", labels={"page": "listing"}), profiler.stage("parse"):
+                        soup = BeautifulSoup(html, "html.parser")
+                        items = soup.select("div.structItem.structItem--thread")
                     if not items:
                         break
 
                     stop = False
+                    candidates: List[Post] = []
 
                     for item in items:
-                        link = item.select_one("div.structItem-title a[href*='/threads/']")
-                        if not link:
+                        post = self._parse_listing_item(item)
+                        if not post:
                             continue
 
-                        title = link.get_text(strip=True)
-                        href = link.get("href", "")
-                        match = re.search(r"\.(\d+)/?$", href)
-                        if not match:
-                            continue
-
-                        external_id = match.group(1)
-                        post_url = href if href.startswith("http") else f"{self.base_url}{href}"
-                        author_tag = item.select_one("ul.structItem-parts a.username")
-                        author = author_tag.get_text(strip=True) if author_tag else ""
-                        category_tag = None
-                        for li in item.select("ul.structItem-parts li a"):
-                            href = li.get("href", "")
-                            if "/forums/" in href:
-                                category_tag = li
-                                break
-
-                        category_name = category_tag.get_text(strip=True) if category_tag else ""
-                        replies = 0
-                        views = 0
-
-                        for pair in item.select("div.structItem-cell--meta dl.pairs"):
-                            dt = pair.select_one("dt")
-                            dd = pair.select_one("dd")
-                            if not dt or not dd:
-                                continue
-
-                            label = dt.get_text(strip=True).lower()
-                            value = self._parse_count(dd.get_text())
-
-                            if label == "replies":
-                                replies = value
-                            elif label == "views":
-                                views = value
-
-                        time_tag = item.select_one("time.structItem-latestDate")
-                        if time_tag and time_tag.has_attr("datetime"):
-                            published_at = datetime.fromisoformat(
-                                time_tag["datetime"]
-                            ).astimezone(timezone.utc)
-
-                        else:
-                            published_at = datetime.utcnow()
-
-                        if published_at < cutoff:
+                        if post.published_at < cutoff:
                             stop = True
                             break
 
-                        content = await self._scrape_thread(session, post_url)
-                        if content:
-                            content_html = content.get("content_html", "")
-                            content_text = content.get("content_text", "")
-                        else:
-                            content_html = ""
-
-                        posts.append({
-                            "platform": "elitetrader",
-                            "external_id": external_id,
-                            "url": post_url,
-                            "category": category_name,
-                            "title": title,
-                            "content_text": content_text,
-                            # "content_html": content_html,
-                            "author": author,
-                            "replies": replies,
-                            "views": views,
-                            "published_at": published_at
-                        })
-
-                        if len(posts) >= self.max_posts_per_run:
+                        candidates.append(post)
+
+                        if len(posts) + len(candidates) >= self.max_posts_per_run:
                             stop = True
                             break
 
-                        await asyncio.sleep(self.delay)
+                    failed = await self._fill_content(client, candidates)
+                    if failed:
+                        # never spool them with empty content: dedupe would
+                        # keep them empty; the next run fetches them again
+                        failed_ids = {p.external_id for p in failed}
+                        candidates = [p for p in candidates if p.external_id not in failed_ids]
+                        metrics.incr("posts_deferred", len(failed))
+                        log_debug(f"Deferred {len(failed)} posts whose thread fetch failed")
+
+                    posts.extend(candidates)
+                    if on_batch and candidates:
+                        on_batch(candidates)
 
                     if stop:
                         break
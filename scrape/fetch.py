@@ -0,0 +1,327 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from utils.log_debug import log_debug
+from utils.metrics import metrics
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Retry-After is either delta-seconds or an HTTP-date.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+# -----------------------------
+# AIMD concurrency limiter
+# -----------------------------
+class AdaptiveLimiter:
+    """
+    Caps in-flight requests. The cap halves on throttling (429) and grows
+    by one after `limit` consecutive successes.
+    """
+
+    def __init__(self, initial: int = 2, minimum: int = 1, maximum: int = 8):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = max(minimum, min(initial, maximum))
+        self.in_flight = 0
+        self._successes = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._cond:
+            while self.in_flight >= self.limit:
+                await self._cond.wait()
+            self.in_flight += 1
+
+    async def release(self):
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.release()
+
+    def on_success(self):
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.maximum:
+            self.limit += 1
+            self._successes = 0
+            metrics.observe("concurrency_limit", self.limit)
+
+    def on_throttle(self):
+        self._successes = 0
+        new_limit = max(self.minimum, self.limit // 2)
+        if new_limit != self.limit:
+            self.limit = new_limit
+            metrics.observe("concurrency_limit", self.limit)
+
+
+# -----------------------------
+# Per-host circuit breaker
+# -----------------------------
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects
+    requests for `reset_timeout` seconds, then lets one trial through.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        # how long the current open state lasts; a long Retry-After extends it
+        self.open_seconds = reset_timeout
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if time.monotonic() - self.opened_at < self.open_seconds:
+            return False
+        if self._trial_in_flight:
+            return False
+        self._trial_in_flight = True
+        return True
+
+    def retry_in(self) -> float:
+        """
+        Seconds until the breaker lets a request through again; 0 when closed.
+        """
+        if self.opened_at is None:
+            return 0.0
+        remaining = self.open_seconds - (time.monotonic() - self.opened_at)
+        # past the timeout but another caller holds the trial
+        return max(remaining, 1.0)
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.open_seconds = self.reset_timeout
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                metrics.incr("circuit_opened")
+            self.opened_at = time.monotonic()
+            self.open_seconds = self.reset_timeout
+
+    def open_for(self, seconds: float):
+        """
+        Reject every request for at least `seconds`, e.g. a Retry-After
+        longer than the client is willing to sleep in place.
+        """
+        if self.opened_at is None:
+            metrics.incr("circuit_opened")
+        self.opened_at = time.monotonic()
+        self.open_seconds = max(self.reset_timeout, seconds)
+        self._trial_in_flight = False
+
+
+# -----------------------------
+# Per-host request pacing
+# -----------------------------
+class RateLimiter:
+    """
+    Spaces request starts at least 1 / rate seconds apart.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+                now = self._next
+            self._next = now + self.interval
+
+
+class HostState:
+    def __init__(self, limiter: AdaptiveLimiter, breaker: CircuitBreaker, rate: Optional[RateLimiter] = None):
+        self.limiter = limiter
+        self.breaker = breaker
+        self.rate = rate
+
+
+# -----------------------------
+# Shared fetch client
+# -----------------------------
+class FetchClient:
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        max_retries: int = 3,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        initial_concurrency: int = 2,
+        max_concurrency: int = 4,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+        timeout: Optional[float] = None,
+        chunk_size: int = 64 * 1024,
+        rate_limit: Optional[float] = None,
+    ):
+        self.session = session
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.initial_concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.rate_limit = rate_limit
+        self.hosts: Dict[str, HostState] = {}
+
+    def _host(self, url: str) -> HostState:
+        host = urlsplit(url).netloc
+        state = self.hosts.get(host)
+        if state is None:
+            state = HostState(
+                AdaptiveLimiter(initial=self.initial_concurrency, maximum=self.max_concurrency),
+                CircuitBreaker(self.failure_threshold, self.reset_timeout),
+                RateLimiter(self.rate_limit) if self.rate_limit else None,
+            )
+            self.hosts[host] = state
+        return state
+
+    def circuit_wait(self, url: str) -> float:
+        return self._host(url).breaker.retry_in()
+
+    def _backoff(self, attempt: int) -> float:
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(ceiling / 2, ceiling)
+
+    async def _read(self, resp, stop_marker: Optional[bytes], stop_count: int, max_bytes: Optional[int]) -> bytes:
+        if stop_marker is None and max_bytes is None:
+            return await resp.read()
+
+        buf = bytearray()
+        seen = 0
+        async for chunk in resp.content.iter_chunked(self.chunk_size):
+            search_from = max(0, len(buf) - len(stop_marker) + 1) if stop_marker else 0
+            buf += chunk
+
+            if stop_marker:
+                pos = buf.find(stop_marker, search_from)
+                while pos != -1:
+                    seen += 1
+                    if seen >= stop_count:
+                        metrics.incr("fetch_truncated")
+                        return bytes(buf[:pos])
+                    pos = buf.find(stop_marker, pos + len(stop_marker))
+
+            if max_bytes is not None and len(buf) >= max_bytes:
+                metrics.incr("fetch_truncated")
+                return bytes(buf[:max_bytes])
+
+        return bytes(buf)
+
+    async def get_text(
+        self,
+        url: str,
+        stop_marker: Optional[bytes] = None,
+        stop_count: int = 1,
+        max_bytes: Optional[int] = None,
+    ) -> str:
+        """
+        Returns the body of a 200 response, or "" once retries are
+        exhausted, the status is not retryable, or the host's circuit is open.
+
+        With `stop_marker`, the body is streamed and cut just before the
+        `stop_count`-th occurrence of the marker; `max_bytes` caps it outright.
+        """
+        state = self._host(url)
+        request_kwargs = {"timeout": self.timeout} if self.timeout is not None else {}
+
+        for attempt in range(self.max_retries):
+            if not state.breaker.allow():
+                metrics.incr("circuit_rejected")
+                log_debug(f"Circuit open for {urlsplit(url).netloc}, skipping {url}")
+                return ""
+
+            retry_after = None
+            try:
+                async with state.limiter:
+                    if state.rate:
+                        await state.rate.wait()
+                    with metrics.timer("fetch_seconds"):
+                        async with self.session.get(url, **request_kwargs) as resp:
+                            metrics.incr("http_responses", labels={"status": resp.status})
+
+                            if resp.status == 200:
+                                body = await self._read(resp, stop_marker, stop_count, max_bytes)
+                                metrics.incr("pages_fetched")
+                                metrics.incr("bytes_downloaded", len(body))
+                                state.breaker.record_success()
+                                state.limiter.on_success()
+                                # get_encoding() needs the body aiohttp buffered itself,
+                                # which a streamed read never sets
+                                return body.decode(resp.charset or "utf-8", errors="replace")
+
+                            if resp.status not in RETRY_STATUSES:
+                                state.breaker.record_success()
+                                return ""
+
+                            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                            if resp.status == 429:
+                                state.limiter.on_throttle()
+                            state.breaker.record_failure()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                metrics.incr("fetch_errors")
+                state.breaker.record_failure()
+
+            if retry_after is not None and retry_after > self.backoff_max:
+                # Retrying before the server's Retry-After gets clients banned;
+                # close the host for that long and give up on this URL.
+                state.breaker.open_for(retry_after)
+                log_debug(f"{urlsplit(url).netloc} asked to retry after {retry_after:.0f}s, pausing host")
+                return ""
+
+            if attempt == self.max_retries - 1:
+                break
+
+            metrics.incr("fetch_retries")
+            delay = self._backoff(attempt)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            await asyncio.sleep(delay)
+
+        return ""
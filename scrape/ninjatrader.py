@@ -4,6 +4,7 @@ from typing import List, Dict
 import re
 from datetime import datetime
 
+from models.post import Post
 from utils.log_debug import log_debug
 
 # -----------------------------
@@ -17,7 +18,7 @@ class NinjaTraderScraper:
         self.max_posts_per_run = max_posts_per_run
         self.timeout = timeout
     
-    def scrape_posts(self) -> List[Dict]:
+    def scrape_posts(self) -> List[Post]:
         response = requests.get(
             self.categories[0],
             headers = self.headers,
@@ -26,7 +27,7 @@ class NinjaTraderScraper:
 
         response.raise_for_status()
         soup = BeautifulSoup(response.text, 'html.parser')
-        posts: List[Dict] = []
+        posts: List[Post] = []
 
         for link in soup.select("a[href*='/forum/']"):
             title = link.get_text(strip=True)
@@ -42,16 +43,13 @@ class NinjaTraderScraper:
             external_id = match.group(1)
             url = href if href.startswith("http") else f"{self.base_url}{href}"
 
-            posts.append({
-                "platform": "ninjatrader",
-                "source": self.categories[0],
-                "external_id": external_id,
-                "url": url,
-                "title": title,
-                "content": "",  
-                "author": "",   
-                "published_at": datetime.now(),  
-            })
+            posts.append(Post(
+                platform="ninjatrader",
+                external_id=external_id,
+                url=url,
+                title=title,
+                published_at=datetime.now(),
+            ))
 
             if len(posts) >= self.max_posts_per_run:
                 break
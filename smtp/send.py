@@ -1,9 +1,13 @@
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List, Dict
+from typing import List
 from html import escape
 from datetime import datetime
+
+from models.post import Post
+from utils.log_debug import log_debug
+from utils.metrics import metrics
 from utils.time_convert import format_human_time
 
 class EmailSender:
@@ -23,7 +27,7 @@ class EmailSender:
         self.sender = sender
         self.recipients = recipients
 
-    def send_email(self, subject: str, posts: List[Dict]):
+    def send_email(self, subject: str, posts: List[Post]):
         html_body = self._build_html(posts)
 
         msg = MIMEMultipart("alternative")
@@ -33,7 +37,7 @@ class EmailSender:
 
         msg.attach(MIMEText(html_body, "html"))
 
-        with smtplib.SMTP(self.host, self.port) as server:
+        with metrics.timer("smtp_seconds"), smtplib.SMTP(self.host, self.port) as server:
             server.starttls()
             server.login(self.username, self.password)
             server.sendmail(
@@ -41,10 +45,11 @@ class EmailSender:
                 self.recipients,
                 msg.as_string()
             )
+            metrics.incr("emails_sent")
 
             log_debug(f"Sent email to {len(self.recipients)} recipients with subject: {subject}")
 
-    def _build_html(self, posts: List[dict]) -> str:
+    def _build_html(self, posts: List[Post]) -> str:
         rows = []
 
         for post in posts:
@@ -54,27 +59,27 @@ class EmailSender:
                             <table width="100%" cellpadding="12" cellspacing="0" border="0">
                                 <tr>
                                     <td valign="top" style="width: 50%; padding: 12px 16px;">
-                                        <a href="{escape(post['url'])}" style="color: #4f7cba; font-size: 16px; text-decoration: none; font-weight: normal; display: block; margin-bottom: 6px;">
-                                            {escape(post['category'])}::{escape(post['title'])}
+                                        <a href="{escape(post.url)}" style="color: #4f7cba; font-size: 16px; text-decoration: none; font-weight: normal; display: block; margin-bottom: 6px;">
+                                            {escape(post.category)}::{escape(post.title)}
                                         </a>
                                         <div style="font-size: 12px; color: #6b7280; line-height: 1.5;">
-                                            {escape(post['author'])}
+                                            {escape(post.author)}
                                         </div>
                                     </td>
                                     <td valign="top" style="width: 25%; padding: 12px 16px; text-align: right;">
                                         <div style="font-size: 12px; color: #4b5563; margin-bottom: 4px;">
-                                            <span style="color: #6b7280;">Replies:</span> <strong>{escape(str(post['replies']))}</strong>
+                                            <span style="color: #6b7280;">Replies:</span> <strong>{escape(str(post.replies))}</strong>
                                         </div>
                                         <div style="font-size: 12px; color: #4b5563;">
-                                            <span style="color: #6b7280;">Views:</span> <strong>{escape(str(post['views']))}</strong>
+                                            <span style="color: #6b7280;">Views:</span> <strong>{escape(str(post.views))}</strong>
                                         </div>
                                     </td>
                                     <td valign="top" style="width: 25%; padding: 12px 16px; text-align: right;">
                                         <div style="font-size: 12px; color: #4f7cba; margin-bottom: 4px;">
-                                            {escape(format_human_time(post['published_at']))}
+                                            {escape(format_human_time(post.published_at))}
                                         </div>
                                         <div style="font-size: 12px; color: #6b7280;">
-                                            Intent Score: {escape(str(post['intent_score']))}
+                                            Intent Score: {escape(str(post.intent_score))}
                                         </div>
                                     </td>
                                 </tr>
@@ -0,0 +1,222 @@
+import asyncio
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from scrape import fetch
+from scrape.fetch import AdaptiveLimiter, CircuitBreaker, FetchClient, parse_retry_after
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(fetch.time, "monotonic", clock)
+    return clock
+
+
+# -----------------------------
+# Fake aiohttp response / session
+# -----------------------------
+class FakeContent:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def iter_chunked(self, size):
+        for chunk in self.chunks:
+            yield chunk
+
+
+class FakeResponse:
+    def __init__(self, status=200, chunks=(), headers=None, charset=None):
+        self.status = status
+        self.headers = headers or {}
+        self.charset = charset
+        self.content = FakeContent(list(chunks))
+
+    async def read(self):
+        return b"".join(self.content.chunks)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = 0
+
+    def get(self, url, **kwargs):
+        self.requests += 1
+        return self.responses.pop(0)
+
+
+# -----------------------------
+# CircuitBreaker
+# -----------------------------
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+    for _ in range(2):
+        breaker.record_failure()
+        assert breaker.allow()
+
+    breaker.record_failure()
+    assert not breaker.allow()
+    assert breaker.retry_in() == pytest.approx(10)
+
+
+def test_breaker_half_open_allows_one_trial(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+
+    clock.now += 10
+    assert breaker.allow()
+    assert not breaker.allow()  # trial already in flight
+
+    breaker.record_success()
+    assert breaker.allow()
+    assert breaker.retry_in() == 0
+
+
+def test_breaker_failed_trial_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert not breaker.allow()
+    clock.now += 9
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+
+
+def test_breaker_open_for_extends_past_reset_timeout(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=10)
+    breaker.open_for(300)
+
+    clock.now += 299
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+
+
+# -----------------------------
+# AdaptiveLimiter (AIMD)
+# -----------------------------
+def test_limiter_halves_on_throttle_down_to_minimum():
+    limiter = AdaptiveLimiter(initial=8, minimum=1, maximum=8)
+    limits = []
+    for _ in range(4):
+        limiter.on_throttle()
+        limits.append(limiter.limit)
+    assert limits == [4, 2, 1, 1]
+
+
+def test_limiter_grows_by_one_after_limit_successes():
+    limiter = AdaptiveLimiter(initial=2, minimum=1, maximum=3)
+    limiter.on_success()
+    assert limiter.limit == 2
+    limiter.on_success()
+    assert limiter.limit == 3
+
+    for _ in range(10):
+        limiter.on_success()
+    assert limiter.limit == 3
+
+
+def test_limiter_throttle_resets_success_streak():
+    limiter = AdaptiveLimiter(initial=4, minimum=1, maximum=8)
+    for _ in range(3):
+        limiter.on_success()
+    limiter.on_throttle()
+    limiter.on_success()
+    assert limiter.limit == 2
+
+
+# -----------------------------
+# Retry-After parsing
+# -----------------------------
+def test_parse_retry_after_seconds():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(" 5 ") == 5.0
+
+
+def test_parse_retry_after_http_date():
+    when = datetime.now(timezone.utc) + timedelta(seconds=90)
+    assert parse_retry_after(format_datetime(when, usegmt=True)) == pytest.approx(90, abs=2)
+
+    past = datetime.now(timezone.utc) - timedelta(hours=1)
+    assert parse_retry_after(format_datetime(past, usegmt=True)) == 0.0
+
+
+def test_parse_retry_after_invalid():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("") is None
+    assert parse_retry_after("soon") is None
+
+
+# -----------------------------
+# Streaming read truncation
+# -----------------------------
+MARKER = b"<article"
+
+
+def read(chunks, stop_marker=None, stop_count=1, max_bytes=None) -> bytes:
+    client = FetchClient(session=None)
+    resp = FakeResponse(chunks=chunks)
+    return asyncio.run(client._read(resp, stop_marker, stop_count, max_bytes))
+
+
+def test_read_stops_before_nth_marker():
+    body = b"head" + MARKER + b"one" + MARKER + b"two"
+    assert read([body], MARKER, stop_count=2) == b"head" + MARKER + b"one"
+
+
+def test_read_finds_marker_split_across_chunks():
+    chunks = [b"head<art", b"icle first <ar", b"ti", b"cle second"]
+    assert read(chunks, MARKER, stop_count=2) == b"head<article first "
+
+
+def test_read_counts_two_markers_in_one_chunk():
+    chunks = [b"a", MARKER + b"x" + MARKER + b"y", b"z"]
+    assert read(chunks, MARKER, stop_count=2) == b"a" + MARKER + b"x"
+
+
+def test_read_without_enough_markers_returns_everything():
+    chunks = [b"a" + MARKER, b"b", b"c"]
+    assert read(chunks, MARKER, stop_count=2) == b"a" + MARKER + b"bc"
+
+
+def test_read_caps_at_max_bytes():
+    assert read([b"12345", b"67890", b"abc"], max_bytes=7) == b"1234567"
+
+
+# -----------------------------
+# get_text
+# -----------------------------
+def test_get_text_decodes_without_charset():
+    session = FakeSession([FakeResponse(chunks=["héllo".encode("utf-8")])])
+    client = FetchClient(session)
+    assert asyncio.run(client.get_text("http://x/t", stop_marker=MARKER)) == "héllo"
+
+
+def test_get_text_long_retry_after_opens_breaker(clock):
+    session = FakeSession([FakeResponse(status=429, headers={"Retry-After": "300"})])
+    client = FetchClient(session, backoff_max=60)
+
+    assert asyncio.run(client.get_text("http://x/t")) == ""
+    assert session.requests == 1
+    assert client.circuit_wait("http://x/t") == pytest.approx(300)
@@ -0,0 +1,134 @@
+import os
+import pickle
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from utils.metrics import metrics
+
+CONFIG_DIR = Path("config")
+CACHE_FILE = Path(".cache/config.pickle")
+CACHE_VERSION = 1
+
+CONFIG_FILES = {
+    "app": "app.yaml",
+    "email": "email.yaml",
+    "sources": "sources.yaml",
+    "keywords": "keywords.yaml",
+    "scoring": "scoring.yaml",
+}
+
+REQUIRED_KEYS = {
+    "app": [("app", "user_agent"), ("app", "run_interval_days")],
+    "email": [("smtp", "host"), ("smtp", "port"), ("smtp", "sender"), ("smtp", "recipients"), ("subject",)],
+    "sources": [("elitetrader", "base_url"), ("elitetrader", "categories"), ("elitetrader", "max_posts_per_run")],
+    "keywords": [("positive",)],
+    "scoring": [("thresholds", "minimum_score")],
+}
+
+
+class ConfigError(ValueError):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class AppConfig:
+    app: Dict
+    email: Dict
+    sources: Dict
+    keywords: Dict
+    scoring: Dict
+
+
+# -----------------------------
+# .env loading (once per process)
+# -----------------------------
+_env_loaded = False
+
+def load_env():
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+
+    env_file = Path(f".env.{os.getenv('APP_ENV', 'local')}")
+    if env_file.exists():
+        from dotenv import load_dotenv
+        load_dotenv(env_file)
+
+
+def env(name: str, default: str = "") -> str:
+    load_env()
+    return os.getenv(name, default)
+
+
+# -----------------------------
+# YAML config with a pre-validated pickle snapshot
+# -----------------------------
+def _fingerprint(config_dir: Path) -> Tuple:
+    # the directory is part of the key: two config dirs can share cache_file
+    files = []
+    for name, filename in sorted(CONFIG_FILES.items()):
+        stat = (config_dir / filename).stat()
+        files.append((name, stat.st_mtime_ns, stat.st_size))
+    return (str(config_dir.resolve()), tuple(files))
+
+
+def _validate(sections: Dict) -> AppConfig:
+    for name, paths in REQUIRED_KEYS.items():
+        section = sections.get(name)
+        if not section:
+            raise ConfigError(f"Missing or empty config file: {CONFIG_FILES[name]}")
+        for path in paths:
+            node = section
+            for key in path:
+                if not isinstance(node, dict) or key not in node:
+                    raise ConfigError(f"{CONFIG_FILES[name]}: missing '{'.'.join(path)}'")
+                node = node[key]
+    return AppConfig(**sections)
+
+
+def _read_cache(cache_file: Path, fingerprint: Tuple) -> Optional[AppConfig]:
+    try:
+        with open(cache_file, "rb") as f:
+            version, cached_fingerprint, config = pickle.load(f)
+    except Exception:
+        return None
+    if version != CACHE_VERSION or cached_fingerprint != fingerprint:
+        return None
+    return config
+
+
+def _write_cache(cache_file: Path, fingerprint: Tuple, config: AppConfig):
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump((CACHE_VERSION, fingerprint, config), f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(cache_file)
+    except OSError:
+        pass
+
+
+def load_config(config_dir: Path = CONFIG_DIR, cache_file: Path = CACHE_FILE) -> AppConfig:
+    try:
+        fingerprint = _fingerprint(config_dir)
+    except FileNotFoundError as e:
+        raise ConfigError(f"Missing config file: {e.filename}")
+
+    config = _read_cache(cache_file, fingerprint)
+    if config is not None:
+        metrics.incr("cache_hits", labels={"cache": "config"})
+        return config
+
+    import yaml
+
+    sections = {}
+    for name, filename in CONFIG_FILES.items():
+        with open(config_dir / filename, "r", encoding="utf-8") as f:
+            sections[name] = yaml.safe_load(f)
+
+    config = _validate(sections)
+    _write_cache(cache_file, fingerprint, config)
+    return config
+
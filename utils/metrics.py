@@ -0,0 +1,167 @@
+import random
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PREFIX = "posts_monitoring"
+
+# Samples kept per histogram for quantiles; count and sum stay exact. This
+# keeps long-lived processes (api.server) at constant memory.
+MAX_SAMPLES = 10_000
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Optional[Dict]) -> Labels:
+    if not labels:
+        return ()
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    inner = ",".join(f'{k}="{v}"' for k, v in pairs)
+    return "{" + inner + "}"
+
+
+# -----------------------------
+# In-process counters / timers / histograms for one run
+# -----------------------------
+class Metrics:
+    def __init__(self, max_samples: int = MAX_SAMPLES):
+        self.max_samples = max_samples
+        self._rng = random.Random()
+        self.reset()
+
+    def reset(self):
+        self.started_at = time.perf_counter()
+        self.counters: Dict[Tuple[str, Labels], float] = defaultdict(float)
+        # reservoir of at most max_samples values per key (Algorithm R)
+        self.histograms: Dict[Tuple[str, Labels], List[float]] = defaultdict(list)
+        self.histogram_counts: Dict[Tuple[str, Labels], int] = defaultdict(int)
+        self.histogram_sums: Dict[Tuple[str, Labels], float] = defaultdict(float)
+
+    def incr(self, name: str, value: float = 1, labels: Optional[Dict] = None):
+        self.counters[(name, _labels(labels))] += value
+
+    def observe(self, name: str, value: float, labels: Optional[Dict] = None):
+        key = (name, _labels(labels))
+        self.histogram_counts[key] += 1
+        self.histogram_sums[key] += value
+
+        samples = self.histograms[key]
+        if len(samples) < self.max_samples:
+            samples.append(value)
+            return
+        slot = self._rng.randrange(self.histogram_counts[key])
+        if slot < self.max_samples:
+            samples[slot] = value
+
+    @contextmanager
+    def timer(self, name: str, labels: Optional[Dict] = None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, labels)
+
+    def counter(self, name: str) -> float:
+        return sum(v for (n, _), v in self.counters.items() if n == name)
+
+    def by_label(self, name: str, label: str) -> Dict[str, float]:
+        out: Dict[str, float] = defaultdict(float)
+        for (n, labels), v in self.counters.items():
+            if n == name:
+                out[dict(labels).get(label, "")] += v
+        return dict(out)
+
+    def values(self, name: str) -> List[float]:
+        out: List[float] = []
+        for (n, _), v in self.histograms.items():
+            if n == name:
+                out.extend(v)
+        return out
+
+    def percentile(self, name: str, q: float) -> float:
+        values = sorted(self.values(name))
+        if not values:
+            return 0.0
+        idx = min(len(values) - 1, max(0, int(round(q * (len(values) - 1)))))
+        return values[idx]
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    # -----------------------------
+    # Per-run summary (stored in logs.metadata)
+    # -----------------------------
+    def summary(self) -> Dict:
+        elapsed = self.elapsed()
+        pages = self.counter("pages_fetched")
+
+        stages = {}
+        for name in sorted({n for (n, _) in self.histograms}):
+            keys = [key for key in self.histogram_counts if key[0] == name]
+            stages[name] = {
+                "count": sum(self.histogram_counts[key] for key in keys),
+                "total": round(sum(self.histogram_sums[key] for key in keys), 4),
+                "p95": round(self.percentile(name, 0.95), 4),
+            }
+
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "pages_fetched": int(pages),
+            "pages_per_second": round(pages / elapsed, 3) if elapsed > 0 else 0.0,
+            "bytes_downloaded": int(self.counter("bytes_downloaded")),
+            "fetch_errors": int(self.counter("fetch_errors")),
+            # per cache (config, author_reputation, api); they are unrelated
+            "cache_hits": {k: int(v) for k, v in sorted(self.by_label("cache_hits", "cache").items())},
+            "fetch_p95_seconds": round(self.percentile("fetch_seconds", 0.95), 4),
+            "stages": stages,
+        }
+
+    # -----------------------------
+    # Prometheus text exposition
+    # -----------------------------
+    def to_prometheus(self) -> str:
+        lines: List[str] = []
+
+        seen = set()
+        for (name, labels), value in sorted(self.counters.items()):
+            metric = f"{PREFIX}_{name}_total"
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} counter")
+                seen.add(metric)
+            lines.append(f"{metric}{_format_labels(labels)} {value:g}")
+
+        for (name, labels), values in sorted(self.histograms.items()):
+            metric = f"{PREFIX}_{name}"
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} summary")
+                seen.add(metric)
+            ordered = sorted(values)
+            for q in (0.5, 0.95, 0.99):
+                idx = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+                quantile = (("quantile", str(q)),)
+                lines.append(f"{metric}{_format_labels(labels, quantile)} {ordered[idx]:.6f}")
+            key = (name, labels)
+            lines.append(f"{metric}_sum{_format_labels(labels)} {self.histogram_sums[key]:.6f}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {self.histogram_counts[key]}")
+
+        lines.append(f"# TYPE {PREFIX}_run_elapsed_seconds gauge")
+        lines.append(f"{PREFIX}_run_elapsed_seconds {self.elapsed():.6f}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        tmp.write_text(self.to_prometheus(), encoding="utf-8")
+        tmp.replace(target)
+
+
+metrics = Metrics()
@@ -0,0 +1,230 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from utils.log_debug import log_debug
+
+ENV_FLAG = "POSTS_PROFILE"
+MODES = ("sample", "cprofile")
+
+_NULL = nullcontext()
+
+Frame = Tuple[str, str, int]
+
+
+def _frame_key(code) -> Frame:
+    return (code.co_name, code.co_filename, code.co_firstlineno)
+
+
+# -----------------------------
+# Stack sampler (stdlib only)
+# -----------------------------
+class StackSampler:
+    """
+    Samples the target thread's stack every `interval` seconds from a
+    background thread. A sample belongs to the innermost frame that has
+    an active stage, which keeps attribution right when asyncio tasks
+    from different stages interleave on one thread.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.active: Dict[object, List[str]] = {}
+        self.samples: Dict[str, Counter] = defaultdict(Counter)
+        self.started = 0.0
+        self.stopped = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.stopped = time.perf_counter()
+
+    def effective_interval(self) -> float:
+        # the sampler waits for the GIL, so real spacing exceeds `interval`
+        total = sum(sum(stacks.values()) for stacks in self.samples.values())
+        if not total:
+            return self.interval
+        return max(self.interval, (self.stopped - self.started) / total)
+
+    def enter(self, frame, stage: str):
+        self.active.setdefault(frame, []).append(stage)
+
+    def exit(self, frame):
+        stages = self.active.get(frame)
+        if stages:
+            stages.pop()
+            if not stages:
+                del self.active[frame]
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack: List[Frame] = []
+            stage = None
+            while frame is not None:
+                if stage is None:
+                    try:
+                        stage = self.active[frame][-1]
+                    except (KeyError, IndexError):
+                        # not a stage frame, or its stage exited mid-read
+                        pass
+                stack.append(_frame_key(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            self.samples[stage or "other"][tuple(stack)] += 1
+
+
+# -----------------------------
+# Per-stage profiler
+# -----------------------------
+class Profiler:
+    """
+    `with profiler.stage("score"):` marks a pipeline stage. When disabled
+    (the default) stage() returns a shared no-op context manager.
+
+    Modes:
+      sample   - stack sampling; writes <stage>.collapsed (flamegraph.pl /
+                 inferno / speedscope) and one speedscope JSON per run
+      cprofile - one deterministic cProfile for the whole run; writes
+                 <run>.pstats (snakeviz, flameprof, gprof2dot). cProfile
+                 sees the whole thread, and stages that span an await
+                 would absorb other tasks' work, so stages are ignored.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.mode = "sample"
+        self.output_dir = Path("debug/profile")
+        self.run_name = ""
+        self._sampler: Optional[StackSampler] = None
+        self._cprofile = None
+
+    def enable(self, mode: str = "sample", output_dir: str = "debug/profile", interval: float = 0.005, run_name: str = "run"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode: {mode} (expected one of {', '.join(MODES)})")
+
+        self.enabled = True
+        self.mode = mode
+        self.output_dir = Path(output_dir)
+        self.run_name = f"{time.strftime('%Y%m%dT%H%M%S')}-{run_name}"
+
+        if mode == "sample":
+            self._sampler = StackSampler(interval)
+            self._sampler.start()
+        else:
+            import cProfile
+
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+            log_debug("cprofile mode records one whole-run profile; use sample mode for per-stage output")
+        log_debug(f"Profiling enabled ({mode}), output in {self.output_dir}")
+
+    def enable_from_env(self, run_name: str = "run") -> bool:
+        """
+        POSTS_PROFILE=1 (or =sample / =cprofile) turns profiling on.
+        """
+        value = os.getenv(ENV_FLAG, "").strip().lower()
+        if not value or value in ("0", "false", "off"):
+            return False
+        self.enable(mode=value if value in MODES else "sample", run_name=run_name)
+        return True
+
+    def stage(self, name: str):
+        if self._sampler is None:
+            return _NULL
+        return self._stage(name, sys._getframe(1))
+
+    @contextmanager
+    def _stage(self, name: str, frame):
+        self._sampler.enter(frame, name)
+        try:
+            yield
+        finally:
+            self._sampler.exit(frame)
+
+    def stop(self) -> List[Path]:
+        if not self.enabled:
+            return []
+        self.enabled = False
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        if self.mode == "sample":
+            self._sampler.stop()
+            written = self._write_samples(self._sampler)
+            self._sampler = None
+        else:
+            self._cprofile.disable()
+            path = self.output_dir / f"{self.run_name}.pstats"
+            self._cprofile.dump_stats(str(path))
+            written = [path]
+            self._cprofile = None
+
+        log_debug(f"Wrote {len(written)} profile file(s) to {self.output_dir}")
+        return written
+
+    # -----------------------------
+    # Output formats
+    # -----------------------------
+    def _write_samples(self, sampler: StackSampler) -> List[Path]:
+        written = []
+        frames: Dict[Frame, int] = {}
+        profiles = []
+        interval = sampler.effective_interval()
+
+        for stage, stacks in sorted(sampler.samples.items()):
+            path = self.output_dir / f"{self.run_name}-{stage}.collapsed"
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, count in stacks.most_common():
+                    names = ";".join(f"{name} ({Path(file).name}:{line})" for name, file, line in stack)
+                    f.write(f"{names} {count}\n")
+            written.append(path)
+
+            samples, weights = [], []
+            for stack, count in stacks.items():
+                samples.append([frames.setdefault(frame, len(frames)) for frame in stack])
+                weights.append(count * interval)
+            profiles.append({
+                "type": "sampled",
+                "name": stage,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            })
+
+        speedscope = {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.run_name,
+            "exporter": "posts-monitoring",
+            "activeProfileIndex": 0,
+            "shared": {
+                "frames": [
+                    {"name": name, "file": file, "line": line}
+                    for (name, file, line), _ in sorted(frames.items(), key=lambda item: item[1])
+                ],
+            },
+            "profiles": profiles,
+        }
+        path = self.output_dir / f"{self.run_name}.speedscope.json"
+        path.write_text(json.dumps(speedscope), encoding="utf-8")
+        written.append(path)
+        return written
+
+
+profiler = Profiler()
@@ -34,3 +34,13 @@ def format_human_time(value) -> str:
         return f"Yesterday at {time_part}"
     else:
         return dt.strftime("%b %d at %I:%M %p").replace(" 0", " ")
+
+def normalize_datetime(dt):
+    """
+    Convert to a naive UTC datetime for TIMESTAMP columns.
+    """
+    if dt is None:
+        return None
+    if dt.tzinfo:
+        return dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt